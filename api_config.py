@@ -20,27 +20,50 @@ class Config:
     DB_USER = os.environ.get('DB_USER') or 'ljw'
     DB_PASSWORD = os.environ.get('DB_PASSWORD') or '123456'
     DB_NAME = os.environ.get('DB_NAME') or 'mqtt'
+    # 数据库与应用同机部署时可指定Unix socket路径，绕过TCP协议栈
+    DB_SOCKET = os.environ.get('DB_SOCKET')
 
 
     # 数据库连接URL
     SQLALCHEMY_DATABASE_URI = f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # 由于GIL限制，连接池大小超过WSGI工作线程数的约2倍只会浪费数据库连接；
+    # pool_size + max_overflow 乘以进程数不应超过MySQL的max_connections
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'pool_recycle': 3600,
-        'pool_timeout': 30
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 25),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 25),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE') or 1800),  # 需小于MySQL的wait_timeout
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+        'pool_reset_on_return': 'rollback'  # 仅在关闭autocommit时生效，autocommit连接归还时不发送ROLLBACK
     }
+    # WSGI工作进程数（与gunicorn的 --workers 一致），用于启动时估算数据库连接总数
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY') or 1)
 
     # 分页配置
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
 
+    # 缓存配置
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'SimpleCache'
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT') or 60)
+    SEND_FILE_MAX_AGE_DEFAULT = 3600
+
+    # Excel导出引擎：fast 直接生成xlsx的XML，xlsxwriter/openpyxl 使用对应的库
+    EXCEL_EXPORT_ENGINE = os.environ.get('EXCEL_EXPORT_ENGINE') or 'fast'
+
     # CORS配置
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
 
     # 日志配置
     LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
     LOG_FILE = os.environ.get('LOG_FILE') or 'app.log'
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES') or 100 * 1024 * 1024)  # 单个日志文件大小上限(字节)
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT') or 5)  # 保留的滚动日志文件数
+    LOG_BUFFER_SIZE = int(os.environ.get('LOG_BUFFER_SIZE') or 65536)  # 日志写缓冲区大小(字节)
+    LOG_FLUSH_INTERVAL = int(os.environ.get('LOG_FLUSH_INTERVAL') or 30)  # 日志定时刷新间隔(秒)
+    # 开启后列表接口在DEBUG日志级别下额外执行一次统计查询，用于排查筛选条件
+    SQL_DEBUG = os.environ.get('SQL_DEBUG', '').lower() in ('1', 'true', 'yes')
 
 
 class DevelopmentConfig(Config):
@@ -57,6 +80,7 @@ class TestingConfig(Config):
     """测试环境配置"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    CACHE_TYPE = 'NullCache'
 
 
 # 配置字典
@@ -5,17 +5,63 @@
 """
 
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from flask_cors import CORS
+import atexit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from functools import lru_cache
+import importlib
+import io
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+import threading
+from typing import Any
+
+import orjson
 
 from database import init_database
 
+# 响应缓存，供路由通过 @cache.cached 使用
+cache = Cache()
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """请求处理路径上常用配置的快照，创建应用时生成一次"""
+    db_manager: Any
+    default_page_size: int
+    max_page_size: int
+    sql_debug: bool
+    excel_engine: str
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """基于orjson的JSON序列化，jsonify等调用自动生效"""
+
+    # datetime交给父类的default处理，保持与Flask默认输出格式一致
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        # 与父类一致：默认按键排序（sort_keys），调试模式下response()传入indent时缩进输出
+        option = self.option
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 def create_app(config_name='default'):
     """应用工厂函数"""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     # 加载配置
     from api_config import config
@@ -24,11 +70,24 @@ def create_app(config_name='default'):
     # 启用CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
 
+    # 初始化响应缓存
+    cache.init_app(app)
+
     # 配置日志
     setup_logging(app)
 
-    # 初始化数据库
-    init_database(app)
+    # 初始化数据库，建立连接放到后台线程中进行，不阻塞应用启动
+    init_database(app, connect=False)
+    start_database_warmup(app)
+
+    # 请求中通过 current_app.extensions['runtime_cfg'] 读取，免去逐项查找app.config
+    app.extensions['runtime_cfg'] = RuntimeConfig(
+        db_manager=app.config['DATABASE_MANAGER'],
+        default_page_size=app.config['DEFAULT_PAGE_SIZE'],
+        max_page_size=app.config['MAX_PAGE_SIZE'],
+        sql_debug=app.config['SQL_DEBUG'],
+        excel_engine=app.config['EXCEL_EXPORT_ENGINE']
+    )
 
     # 注册蓝图
     register_blueprints(app)
@@ -36,6 +95,76 @@ def create_app(config_name='default'):
     return app
 
 
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """带写缓冲的滚动文件日志处理器
+
+    日志先写入缓冲区，由后台线程定时刷新到磁盘；ERROR及以上级别的日志立即刷新。
+    fork出的子进程（如gunicorn --preload的工作进程）不继承线程，刷新线程在子进程中重新启动。
+    """
+
+    def __init__(self, filename, buffer_size=65536, flush_interval=30, **kwargs):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        super().__init__(filename, **kwargs)
+
+        self._flush_stop = threading.Event()
+        if flush_interval > 0:
+            self._start_flusher()
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=self._restart_flusher_after_fork)
+
+    def _start_flusher(self):
+        flusher = threading.Thread(
+            target=self._flush_periodically, args=(self.flush_interval,), daemon=True
+        )
+        flusher.start()
+
+    def _restart_flusher_after_fork(self):
+        # 已关闭的处理器不再启动刷新线程
+        if not self._flush_stop.is_set():
+            self._flush_stop = threading.Event()
+            self._start_flusher()
+
+    def _open(self):
+        # write_through让文本层直接写入BufferedWriter，缓冲区位置即为准确的文件大小
+        raw = open(self.baseFilename, self.mode + 'b', buffering=self.buffer_size)
+        return io.TextIOWrapper(raw, encoding=self.encoding or 'utf-8',
+                                errors=getattr(self, 'errors', None), write_through=True)
+
+    def shouldRollover(self, record):
+        """按缓冲区写入位置判断是否滚动，避免父类每条日志seek/tell触发刷新"""
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            return self.stream.buffer.tell() >= self.maxBytes
+        return False
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self.flush_buffer()
+
+    def flush(self):
+        """StreamHandler每写一条日志都会调用flush，这里改为由定时器和ERROR日志触发"""
+
+    def flush_buffer(self):
+        """将缓冲区内容写入磁盘"""
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, 'flush'):
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self._flush_stop.set()
+        super().close()
+
+    def _flush_periodically(self, interval):
+        while not self._flush_stop.wait(interval):
+            self.flush_buffer()
+
+
 def setup_logging(app):
     """配置日志"""
     if not app.debug and not app.testing:
@@ -45,22 +174,99 @@ def setup_logging(app):
             os.makedirs(log_dir)
 
         # 配置文件日志处理器
-        file_handler = RotatingFileHandler(
+        file_handler = BufferedRotatingFileHandler(
             app.config['LOG_FILE'],
-            maxBytes=10240000,  # 10MB
-            backupCount=10
+            buffer_size=app.config['LOG_BUFFER_SIZE'],
+            flush_interval=app.config['LOG_FLUSH_INTERVAL'],
+            maxBytes=app.config['LOG_MAX_BYTES'],
+            backupCount=app.config['LOG_BACKUP_COUNT']
         )
         file_handler.setFormatter(logging.Formatter(
             '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
         ))
         file_handler.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)
+
+        # 文件写入交给后台线程，请求线程只需将日志记录放入队列；
+        # fork出的子进程没有该线程，在子进程中换用新队列并重新启动，否则日志只会堆积在队列中
+        queue_handler = QueueHandler(None)
+        _start_log_listener(queue_handler, file_handler)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=lambda: _start_log_listener(queue_handler, file_handler))
+        app.logger.addHandler(queue_handler)
 
         app.logger.setLevel(logging.INFO)
         app.logger.info('异常数据管理系统启动')
 
 
+def _start_log_listener(queue_handler, file_handler):
+    """为队列日志处理器创建新队列并启动写文件的后台线程"""
+    log_queue = queue.Queue(-1)
+    queue_handler.queue = log_queue
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def _warm_up_database(app):
+    """建立数据库连接并检查连接数配置"""
+    if not app.config['DATABASE_MANAGER'].connect():
+        raise Exception("数据库初始化失败")
+    app.logger.info('数据库初始化完成')
+    check_connection_budget(app)
+
+
+def start_database_warmup(app):
+    """后台预热数据库连接，首个请求到达时等待预热完成"""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-warmup')
+    app.db_ready = executor.submit(_warm_up_database, app)
+    app.db_ready_pid = os.getpid()
+    executor.shutdown(wait=False)
+
+    @app.before_request
+    def wait_for_database():
+        if app.extensions.get('db_warm'):
+            return
+        # fork出的子进程中没有预热线程，父进程未完成的Future永远不会完成，直接跳过等待
+        if app.db_ready_pid == os.getpid():
+            try:
+                app.db_ready.result(timeout=5)
+            except FutureTimeoutError:
+                # 只等待一次，之后的请求不再阻塞，由查询自行建立连接
+                app.logger.warning('数据库预热超时')
+            except Exception as e:
+                # 预热失败不再重复等待，后续查询会自动重连
+                app.logger.error('数据库预热失败: %s', e)
+        app.extensions['db_warm'] = True
+
+
+def check_connection_budget(app):
+    """检查所有工作进程的连接池上限之和是否超过MySQL的max_connections"""
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    workers = app.config['WEB_CONCURRENCY']
+    expected = (options['pool_size'] + options['max_overflow']) * workers
+
+    result = app.config['DATABASE_MANAGER'].execute_query(
+        "SHOW VARIABLES LIKE 'max_connections'"
+    )
+    if not result['success'] or not result['results']:
+        app.logger.warning('无法读取MySQL的max_connections，跳过连接数检查')
+        return
+
+    max_connections = int(result['results'][0]['Value'])
+    if expected > max_connections:
+        app.logger.warning(
+            '连接池配置可能耗尽数据库连接: (pool_size %d + max_overflow %d) x %d个进程 = %d > max_connections %d',
+            options['pool_size'], options['max_overflow'], workers, expected, max_connections
+        )
+
+
+@lru_cache(maxsize=None)
+def _load_routes():
+    """延迟导入路由模块，同一进程内只导入一次"""
+    return importlib.import_module('app.routes')
+
+
 def register_blueprints(app):
     """注册蓝图"""
-    from app.routes import exception_bp
-    app.register_blueprint(exception_bp, url_prefix='/api')
\ No newline at end of file
+    routes = _load_routes()
+    app.register_blueprint(routes.exception_bp, url_prefix='/api')
\ No newline at end of file
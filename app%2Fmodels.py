@@ -4,44 +4,190 @@
 数据模型定义
 """
 
-import pymysql
-from pymysql import Error, MySQLError
-from pymysql.cursors import DictCursor
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union
+from contextlib import nullcontext
+from threading import Lock
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional
 import logging
+from cachetools import TTLCache
+from constants import DATETIME_FORMAT, INSERT_BATCH_SIZE
 from database import UnifiedDatabaseManager, QueryBuilder, TransactionManager
 
 logger = logging.getLogger(__name__)
 
-
-def get_region_info_by_aid(aid):
-    """根据aid获取市县信息"""
-    if aid is None:
-        return '', '', None, None
-
-    # 第一师行政区划映射 - 使用正确的adcd编码
-    # 第一师adcd前四位是6611，各团前6位为661101-661116
-    region_mapping = {
-        661101: ('第一师', '第一团', 80.1, 40.2),
-        661102: ('第一师', '第二团', 80.3, 40.4),
-        661103: ('第一师', '第三团', 80.5, 40.6),
-        661104: ('第一师', '第四团', 80.7, 40.8),
-        661105: ('第一师', '第五团', 80.9, 40.3),
-        661106: ('第一师', '第六团', 81.1, 40.7),
-        661107: ('第一师', '第七团', 81.3, 40.9),
-        661108: ('第一师', '第八团', 81.5, 41.1),
-        661109: ('第一师', '第九团', 81.7, 41.3),
-        661110: ('第一师', '第十团', 81.9, 41.5),
-        661111: ('第一师', '第十一团', 82.1, 41.7),
-        661112: ('第一师', '第十二团', 82.3, 41.9),
-        661113: ('第一师', '第十三团', 82.5, 42.1),
-        661115: ('第一师', '第十五团', 82.7, 42.3),
-        661116: ('第一师', '第十六团', 82.9, 42.5),
-        123123: ('测试市', '测试县', 120.0, 30.0),  # 原有测试数据
-    }
-
-    return region_mapping.get(int(aid), ('第一师', f'第{aid}团', 80.0, 40.0))
+# 测站和行政区划属于基本不变的参考数据，查询结果缓存10分钟
+_STCD_CACHE = TTLCache(maxsize=4096, ttl=600)
+_ADCD_CACHE = TTLCache(maxsize=2048, ttl=600)
+_REF_CACHE_LOCK = Lock()
+
+
+# 第一师行政区划映射 - 使用正确的adcd编码
+# 第一师adcd前四位是6611，各团前6位为661101-661116
+_REGION_MAPPING = {
+    661101: ('第一师', '第一团', 80.1, 40.2),
+    661102: ('第一师', '第二团', 80.3, 40.4),
+    661103: ('第一师', '第三团', 80.5, 40.6),
+    661104: ('第一师', '第四团', 80.7, 40.8),
+    661105: ('第一师', '第五团', 80.9, 40.3),
+    661106: ('第一师', '第六团', 81.1, 40.7),
+    661107: ('第一师', '第七团', 81.3, 40.9),
+    661108: ('第一师', '第八团', 81.5, 41.1),
+    661109: ('第一师', '第九团', 81.7, 41.3),
+    661110: ('第一师', '第十团', 81.9, 41.5),
+    661111: ('第一师', '第十一团', 82.1, 41.7),
+    661112: ('第一师', '第十二团', 82.3, 41.9),
+    661113: ('第一师', '第十三团', 82.5, 42.1),
+    661115: ('第一师', '第十五团', 82.7, 42.3),
+    661116: ('第一师', '第十六团', 82.9, 42.5),
+    123123: ('测试市', '测试县', 120.0, 30.0),  # 原有测试数据
+}
+
+
+def _region_case_sql(index: int, null_value: str, fallback: str, alias: str) -> str:
+    """
+    由_REGION_MAPPING生成按aid取市县信息的CASE表达式
+    aid先转换为整数再比较，与按 int(aid) 查找映射的原逻辑一致，带前导零或首尾空白的aid也能匹配
+    """
+    parts = [f"CASE WHEN aid IS NULL THEN {null_value} ELSE CASE CAST(aid AS SIGNED)"]
+    for aid, region in _REGION_MAPPING.items():
+        value = region[index]
+        literal = f"'{value}'" if isinstance(value, str) else repr(value)
+        parts.append(f"WHEN {aid} THEN {literal}")
+    parts.append(f"ELSE {fallback} END END AS {alias}")
+    return ' '.join(parts)
+
+
+# 市县信息及经纬度由数据库随查询结果一并返回，不再逐行查表
+_REGION_SQL_COLUMNS = [
+    _region_case_sql(0, "''", "'第一师'", 'shi'),
+    _region_case_sql(1, "''", "CONCAT('第', aid, '团')", 'xian'),
+    _region_case_sql(2, 'NULL', '80.0', 'lgtd'),
+    _region_case_sql(3, 'NULL', '40.0', 'lttd'),
+]
+
+
+def _to_float(value):
+    """数值字段转换为float，保留0值，NULL返回None"""
+    return None if value is None else float(value)
+
+
+def _to_int(value):
+    """数值字段转换为int，保留0值，NULL返回None"""
+    return None if value is None else int(value)
+
+
+def _parse_dt(value, _fmt=DATETIME_FORMAT, _dt=datetime):
+    """将数据库中的时间值统一格式化为字符串，驱动对DATETIME列直接返回datetime"""
+    # 精确类型判断先行，NULL及其他类型原样返回
+    if type(value) is _dt:
+        return value.strftime(_fmt)
+    if value is None or not isinstance(value, _dt):
+        return value
+    return value.strftime(_fmt)
+
+
+def _rows_to_items(rows: List[Dict]) -> List[Dict]:
+    """将异常数据查询结果行转换为接口返回的字典列表"""
+    _pd = _parse_dt
+    _float = _to_float
+    _int = _to_int
+    items = []
+    append = items.append
+    for row in rows:
+        append({
+            'stcd': row['stcd'],
+            'stnm': row['stnm'],
+            'aid': row['aid'],
+            'val': _float(row['val']),
+            'rem': row['rem'],
+            'tm': _pd(row['tm']),
+            'insert_tm': _pd(row['insert_tm']),
+            're_name': row['re_name'],
+            'status': _int(row['status']),
+            're_time': _pd(row['re_time']),
+            'shi': row['shi'],
+            'xian': row['xian'],
+            # CASE中的小数常量以DECIMAL返回
+            'lgtd': _float(row['lgtd']),
+            'lttd': _float(row['lttd'])
+        })
+    return items
+
+
+# 异常数据列表查询的列
+_EXCEPTION_COLUMNS = ['stcd', 'stnm', 'aid', 'tm', 'val', 'rem',
+                      'insert_tm', 're_name', 'status', 're_time'] + _REGION_SQL_COLUMNS
+
+# 按status过滤的条件：0-待反馈，1-已反馈，2-全部（不过滤）
+_STATUS_CONDITIONS = {0: 'rem IS NULL', 1: 'rem IS NOT NULL'}
+
+
+def _like_prefix(prefix: str) -> str:
+    """返回匹配以prefix开头的LIKE模式，prefix中的通配符按普通字符处理"""
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+
+def _build_filtered_select(adcd: str = None, stcd: str = None,
+                           start_time: datetime = None, end_time: datetime = None,
+                           name: str = None, status: int = None):
+    """构建异常数据的筛选查询，返回 (sql, params)"""
+    where_parts = ['1=1']
+    params = []
+
+    if adcd:
+        # 前缀LIKE同样可以走aid索引的范围扫描，且比较规则与列的排序规则一致
+        where_parts.append('aid LIKE %s')
+        params.append(_like_prefix(adcd))
+
+    if stcd:
+        where_parts.append('stcd = %s')
+        params.append(stcd)
+
+    if name:
+        where_parts.append('stnm LIKE %s')
+        params.append('%' + name + '%')
+
+    if start_time:
+        where_parts.append('tm >= %s')
+        params.append(start_time)
+
+    if end_time:
+        where_parts.append('tm <= %s')
+        params.append(end_time)
+
+    status_condition = _STATUS_CONDITIONS.get(status)
+    if status_condition:
+        where_parts.append(status_condition)
+
+    sql = QueryBuilder.build_select(
+        table='TZX_STCD_EXCE',
+        columns=_EXCEPTION_COLUMNS,
+        where_clause=' AND '.join(where_parts)
+    )
+    return sql, params
+
+
+def invalidate_station_cache():
+    """清空测站和行政区划缓存，修改参考数据后调用"""
+    with _REF_CACHE_LOCK:
+        _STCD_CACHE.clear()
+        _ADCD_CACHE.clear()
+
+
+class Stats(NamedTuple):
+    """异常数据统计信息，序列化时调用 _asdict()"""
+    total_pending: int
+    station_count: int
+    farm_count: int
+    latest_time: Optional[str]
+
+
+class HealthStatus(NamedTuple):
+    """健康检查结果，序列化时调用 _asdict()"""
+    status: str
+    message: str
+    timestamp: str
 
 
 class BaseModel:
@@ -66,27 +212,81 @@ class ST_STBPRP_B(BaseModel):
     @staticmethod
     def get_by_stcd(db_manager: UnifiedDatabaseManager, stcd: str) -> Optional[Dict]:
         """根据测站编码获取测站信息"""
+        with _REF_CACHE_LOCK:
+            station = _STCD_CACHE.get(stcd)
+        if station is not None:
+            return station
+
         try:
             sql = QueryBuilder.build_select(
                 table='ST_STBPRP_B',
                 columns=['stcd', 'stnm', 'lgtd', 'lttd'],
                 where_clause='stcd = %s'
             )
-            results = db_manager.execute_query(sql, (stcd,))
+            result = db_manager.execute_query(sql, (stcd,))
+            results = result['results'] if result.get('success') else []
 
             if results:
-                return {
+                station = {
                     'stcd': results[0]['stcd'],
                     'stnm': results[0]['stnm'],
-                    'lgtd': float(results[0]['lgtd']) if results[0]['lgtd'] else None,
-                    'lttd': float(results[0]['lttd']) if results[0]['lttd'] else None
+                    'lgtd': _to_float(results[0]['lgtd']),
+                    'lttd': _to_float(results[0]['lttd'])
                 }
+                # 只缓存查到的测站，新增测站无需等待缓存过期
+                with _REF_CACHE_LOCK:
+                    _STCD_CACHE[stcd] = station
+                return station
             return None
 
         except Exception as e:
-            logger.error(f"获取测站信息失败: {e}")
+            logger.error("获取测站信息失败: %s", e)
             return None
 
+    @staticmethod
+    def get_by_stcds(db_manager: UnifiedDatabaseManager, stcds: List[str]) -> Dict[str, Dict]:
+        """批量获取测站信息，返回 {stcd: 测站信息}，未找到的测站不出现在结果中"""
+        stations = {}
+        missing = []
+        with _REF_CACHE_LOCK:
+            for stcd in dict.fromkeys(stcds):
+                station = _STCD_CACHE.get(stcd)
+                if station is not None:
+                    stations[stcd] = station
+                else:
+                    missing.append(stcd)
+
+        if not missing:
+            return stations
+
+        try:
+            # 未命中缓存的测站合并为一次IN查询
+            sql = QueryBuilder.build_select(
+                table='ST_STBPRP_B',
+                columns=['stcd', 'stnm', 'lgtd', 'lttd'],
+                where_clause=f"stcd IN ({', '.join(['%s'] * len(missing))})"
+            )
+            result = db_manager.execute_query(sql, tuple(missing))
+            results = result['results'] if result.get('success') else []
+
+            fetched = {
+                row['stcd']: {
+                    'stcd': row['stcd'],
+                    'stnm': row['stnm'],
+                    'lgtd': _to_float(row['lgtd']),
+                    'lttd': _to_float(row['lttd'])
+                }
+                for row in results
+            }
+            with _REF_CACHE_LOCK:
+                _STCD_CACHE.update(fetched)
+            stations.update(fetched)
+
+        except Exception as e:
+            logger.error("批量获取测站信息失败: %s", e)
+
+        return stations
+
     @staticmethod
     def get_all_stations(db_manager: UnifiedDatabaseManager) -> List[Dict]:
         """获取所有测站信息"""
@@ -102,14 +302,14 @@ class ST_STBPRP_B(BaseModel):
                 {
                     'stcd': row['stcd'],
                     'stnm': row['stnm'],
-                    'lgtd': float(row['lgtd']) if row['lgtd'] else None,
-                    'lttd': float(row['lttd']) if row['lttd'] else None
+                    'lgtd': _to_float(row['lgtd']),
+                    'lttd': _to_float(row['lttd'])
                 }
                 for row in results['results'] if results.get('success')
             ]
 
         except Exception as e:
-            logger.error(f"获取所有测站信息失败: {e}")
+            logger.error("获取所有测站信息失败: %s", e)
             return []
 
 
@@ -124,31 +324,40 @@ class AD_CD_B(BaseModel):
     @staticmethod
     def get_by_adcd(db_manager: UnifiedDatabaseManager, adcd: str) -> Optional[Dict]:
         """根据行政区划代码获取信息"""
+        with _REF_CACHE_LOCK:
+            region = _ADCD_CACHE.get(adcd)
+        if region is not None:
+            return region
+
         try:
             sql = QueryBuilder.build_select(
                 table='AD_CD_B',
                 columns=['aid', 'adcd', 'adnm', 'lgtd', 'lttd'],
                 where_clause='adcd = %s'
             )
-            results = db_manager.execute_query(sql, (adcd,))
+            result = db_manager.execute_query(sql, (adcd,))
+            results = result['results'] if result.get('success') else []
 
             if results:
-                return {
+                region = {
                     'aid': results[0]['aid'],
                     'adcd': results[0]['adcd'],
                     'adnm': results[0]['adnm'],
-                    'lgtd': float(results[0]['lgtd']) if results[0]['lgtd'] else None,
-                    'lttd': float(results[0]['lttd']) if results[0]['lttd'] else None
+                    'lgtd': _to_float(results[0]['lgtd']),
+                    'lttd': _to_float(results[0]['lttd'])
                 }
+                with _REF_CACHE_LOCK:
+                    _ADCD_CACHE[adcd] = region
+                return region
             return None
 
         except Exception as e:
-            logger.error(f"获取行政区划信息失败: {e}")
+            logger.error("获取行政区划信息失败: %s", e)
             return None
 
     @staticmethod
     def get_all_regions(db_manager: UnifiedDatabaseManager) -> List[Dict]:
-        """获取所有行政区划"""
+        """获取所有行政区划；查询失败时抛出异常，避免空列表被当作正常结果缓存"""
         try:
             sql = QueryBuilder.build_select(
                 table='AD_CD_B',
@@ -156,6 +365,8 @@ class AD_CD_B(BaseModel):
                 order_by='aid'
             )
             results = db_manager.execute_query(sql)
+            if not results['success']:
+                raise Exception(results.get('error', '未知错误'))
 
             return [
                 {
@@ -163,12 +374,12 @@ class AD_CD_B(BaseModel):
                     'adcd': row['adcd'],
                     'adnm': row['adnm']
                 }
-                for row in results['results'] if results.get('success')
+                for row in results['results']
             ]
 
         except Exception as e:
-            logger.error(f"获取所有行政区划失败: {e}")
-            return []
+            logger.error("获取所有行政区划失败: %s", e)
+            raise
 
 
 class ExceptionData(BaseModel):
@@ -207,36 +418,67 @@ class ExceptionData(BaseModel):
             logger.info("异常数据表创建成功或已存在")
 
         except Exception as e:
-            logger.error(f"创建异常数据表失败: {e}")
+            logger.error("创建异常数据表失败: %s", e)
+
+    # 批量插入的列顺序，以及表中NOT NULL、插入时必须提供的列
+    _INSERT_COLUMNS = ('stcd', 'stnm', 'aid', 'tm', 'val', 'rem', 're_name', 'status')
+    _REQUIRED_COLUMNS = frozenset(('stcd', 'stnm', 'tm', 'val'))
 
     @staticmethod
-    def insert_exception(db_manager: UnifiedDatabaseManager, stcd: str, stnm: str, aid: str,
-                      tm: datetime, val: float, rem: str = None,
-                      re_name: str = None, status: int = 0) -> bool:
-        """插入异常记录"""
+    def insert_exceptions_bulk(db_manager: UnifiedDatabaseManager, rows: List[Dict[str, Any]]) -> int:
+        """批量插入异常记录，多行合并为一条 INSERT ... VALUES (...), (...) 语句，返回插入行数"""
+        if not rows:
+            return 0
+
+        # 与execute_insert一致，缺少必填字段时抛出ValueError，而不是写入NULL
+        for row in rows:
+            missing = ExceptionData._REQUIRED_COLUMNS.difference(row)
+            if missing:
+                raise ValueError(f"插入数据缺少字段: {', '.join(sorted(missing))}")
+
+        columns = ExceptionData._INSERT_COLUMNS
+        row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+        batch_size = INSERT_BATCH_SIZE
+        inserted = 0
+
+        # 单条语句本身是原子的，只有分多批写入时才需要事务
+        transaction = TransactionManager(db_manager) if len(rows) > batch_size else nullcontext()
+
         try:
-            sql = QueryBuilder.build_insert(
-                table='TZX_STCD_EXCE',
-                data={
-                    'stcd': stcd,
-                    'stnm': stnm,
-                    'aid': aid,
-                    'tm': tm.strftime('%Y-%m-%d %H:%M:%S'),
-                    'val': val,
-                    'rem': rem,
-                    're_name': re_name,
-                    'status': status
-                }
-            )
+            with transaction:
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    sql = (f"INSERT INTO TZX_STCD_EXCE ({', '.join(columns)}) VALUES "
+                           + ', '.join([row_placeholder] * len(batch)))
+                    params = tuple(row.get(column) for row in batch for column in columns)
 
-            with TransactionManager(db_manager) as tx:
-                result = db_manager.execute_query(sql)
-                logger.info(f"异常记录插入成功: {stcd}, {tm}")
-                return True
+                    result = db_manager.execute_query(sql, params)
+                    if not result['success']:
+                        raise Exception(result.get('error', '未知错误'))
+                    inserted += result['affected_rows']
+
+            logger.info("异常记录批量插入成功: %s条", inserted)
+            return inserted
 
         except Exception as e:
-            logger.error(f"插入异常记录失败: {e}")
-            return False
+            logger.error("批量插入异常记录失败: %s", e)
+            return 0
+
+    @staticmethod
+    def insert_exception(db_manager: UnifiedDatabaseManager, stcd: str, stnm: str, aid: str,
+                      tm: datetime, val: float, rem: str = None,
+                      re_name: str = None, status: int = 0) -> bool:
+        """插入异常记录"""
+        return ExceptionData.insert_exceptions_bulk(db_manager, [{
+            'stcd': stcd,
+            'stnm': stnm,
+            'aid': aid,
+            'tm': tm,
+            'val': val,
+            'rem': rem,
+            're_name': re_name,
+            'status': status
+        }]) > 0
 
     @staticmethod
     def get_pending_exceptions(db_manager: UnifiedDatabaseManager, page: int = 1, page_size: int = 20,
@@ -245,80 +487,46 @@ class ExceptionData(BaseModel):
                                name: str = None, status: int = 0) -> Dict[str, Any]:
         """获取异常数据（支持按status过滤），对相同测站去重只保留最新异常"""
         try:
-            # 构建基础查询
-            base_sql = QueryBuilder.build_select(
-                table='TZX_STCD_EXCE',
-                columns=['stcd', 'stnm', 'aid', 'tm', 'val', 'rem',
-                       'insert_tm', 're_name', 'status', 're_time'],
-                where_clause='1=1'
-            )
-
-            # 添加筛选条件
-            conditions = []
-            params = []
-
-            if adcd:
-                conditions.append("AND aid LIKE %s")
-                params.append(f"{adcd}%")
-
-            if stcd:
-                conditions.append("AND stcd = %s")
-                params.append(stcd)
-
-            if name:
-                conditions.append("AND stnm LIKE %s")
-                params.append(f"%{name}%")
-
-            if start_time:
-                conditions.append("AND tm >= %s")
-                params.append(start_time.strftime('%Y-%m-%d %H:%M:%S'))
-
-            if end_time:
-                conditions.append("AND tm <= %s")
-                params.append(end_time.strftime('%Y-%m-%d %H:%M:%S'))
-
-            # 添加状态过滤条件
-            if status is not None:
-                if status == 0:
-                    conditions.append("AND rem IS NULL")
-                elif status == 1:
-                    conditions.append("AND rem IS NOT NULL")
-                # status == 2 不添加过滤条件
+            # 构建带筛选条件的基础查询
+            base_sql, params = _build_filtered_select(adcd, stcd, start_time, end_time, name, status)
 
-            # 应用筛选条件
-            for condition in conditions:
-                base_sql += f" {condition}"
+            # 分页参数绑定为整数
+            page_size = int(page_size)
+            limit_params = (page_size, (int(page) - 1) * page_size)
 
             # 根据status决定是否去重：只有待反馈记录(status=0)才进行去重
             if status == 0:
                 # 对于待反馈的记录，对相同测站去重只保留最新异常
+                # 窗口函数只扫描一次过滤结果，去重后的总数随分页结果一并返回
                 final_sql = f"""
-                SELECT a.* FROM (
-                    SELECT * FROM ({base_sql}) as base_data
-                ) a
-                LEFT JOIN (
-                    SELECT stcd, MAX(tm) as max_tm
-                    FROM ({base_sql}) as base_data
-                    GROUP BY stcd
-                ) b ON a.stcd = b.stcd AND a.tm = b.max_tm
-                WHERE b.stcd IS NOT NULL
-                ORDER BY a.tm DESC
-                LIMIT {page_size} OFFSET {(page-1) * page_size}
+                WITH base_data AS (
+                    SELECT b.*, ROW_NUMBER() OVER (PARTITION BY stcd ORDER BY tm DESC) AS rn
+                    FROM ({base_sql}) AS b
+                )
+                SELECT base_data.*, COUNT(*) OVER () AS total
+                FROM base_data
+                WHERE rn = 1
+                ORDER BY tm DESC
+                LIMIT %s OFFSET %s
                 """
-                # 为子查询准备双倍的参数（因为有两个相同的子查询）
-                all_params = tuple(params * 2)
+                all_params = tuple(params) + limit_params
             else:
                 # 对于已处理记录(status=1)或全部记录(status=2)，不进行去重
-                final_sql = f"{base_sql} ORDER BY tm DESC LIMIT {page_size} OFFSET {(page-1) * page_size}"
+                final_sql = f"""
+                SELECT base_data.*, COUNT(*) OVER () AS total
+                FROM ({base_sql}) AS base_data
+                ORDER BY tm DESC
+                LIMIT %s OFFSET %s
+                """
                 # 不需要去重，只需要一套参数
-                all_params = tuple(params)
+                all_params = tuple(params) + limit_params
 
             # 执行查询
             results = db_manager.execute_query(final_sql, all_params)
 
             # 检查查询结果
             if not results.get('success'):
-                logger.error(f"查询失败: {results.get('error', 'Unknown error')}")
+                logger.error("查询失败: %s", results.get('error', 'Unknown error'))
                 return {
                     'total': 0,
                     'page': page,
@@ -328,59 +536,32 @@ class ExceptionData(BaseModel):
                 }
 
             # 根据status决定计数逻辑
-            if status == 0:
-                # 对于待反馈记录，按去重后的测站数量计数
-                count_sql = f"""
-                SELECT COUNT(DISTINCT stcd) as total
-                FROM ({base_sql}) as count_data
-                """
+            if results['results']:
+                # 窗口函数已随分页结果给出总数（status=0时为去重后的测站数量）
+                total = results['results'][0]['total']
+            elif page == 1:
+                # 第一页就没有数据，总数必然为0
+                total = 0
             else:
-                # 对于已处理记录或全部记录，按实际记录数量计数
-                count_sql = f"""
-                SELECT COUNT(*) as total
-                FROM ({base_sql}) as count_data
-                """
+                # 页码超出范围时没有返回行，单独计数
+                if status == 0:
+                    # 对于待反馈记录，按去重后的测站数量计数
+                    count_sql = f"""
+                    SELECT COUNT(DISTINCT stcd) as total
+                    FROM ({base_sql}) as count_data
+                    """
+                else:
+                    # 对于已处理记录或全部记录，按实际记录数量计数
+                    count_sql = f"""
+                    SELECT COUNT(*) as total
+                    FROM ({base_sql}) as count_data
+                    """
 
-            count_result = db_manager.execute_query(count_sql, tuple(params))
-            total = count_result['results'][0]['total'] if count_result['success'] and count_result['results'] else 0
+                count_result = db_manager.execute_query(count_sql, tuple(params))
+                total = count_result['results'][0]['total'] if count_result['success'] and count_result['results'] else 0
 
             # 转换为字典格式
-            def parse_datetime(value):
-                if value is None:
-                    return None
-                if isinstance(value, datetime):
-                    return value.strftime('%Y-%m-%d %H:%M:%S')
-                if isinstance(value, str):
-                    # 验证并标准化时间格式
-                    try:
-                        dt = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-                        return dt.strftime('%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        return value  # 如果无法解析，返回原值
-                return value
-
-            items = []
-            for row in results['results']:
-                # 根据aid判断市县信息和经度纬度
-                aid = row['aid']
-                shi, xian, lgtd, lttd = get_region_info_by_aid(aid)
-
-                items.append({
-                    'stcd': row['stcd'],
-                    'stnm': row['stnm'],
-                    'aid': row['aid'],
-                    'val': float(row['val']) if row['val'] else None,
-                    'rem': row['rem'],
-                    'tm': parse_datetime(row['tm']),
-                    'insert_tm': parse_datetime(row['insert_tm']),
-                    're_name': row['re_name'],
-                    'status': int(row['status']) if row['status'] else None,
-                    're_time': parse_datetime(row['re_time']),
-                    'shi': shi,
-                    'xian': xian,
-                    'lgtd': lgtd,
-                    'lttd': lttd
-                })
+            items = _rows_to_items(results['results'])
 
             return {
                 'total': total,
@@ -391,7 +572,7 @@ class ExceptionData(BaseModel):
             }
 
         except Exception as e:
-            logger.error(f"获取待反馈异常数据失败: {e}")
+            logger.error("获取待反馈异常数据失败: %s", e)
             return {
                 'total': 0,
                 'page': page,
@@ -400,108 +581,34 @@ class ExceptionData(BaseModel):
                 'items': []
             }
 
+    @staticmethod
+    def iter_filtered_exceptions(db_manager: UnifiedDatabaseManager, adcd: str = None, stcd: str = None,
+                                 start_time: datetime = None, end_time: datetime = None,
+                                 name: str = None, status: int = 0,
+                                 fetch_size: int = 1000) -> Iterator[Dict]:
+        """逐条返回过滤后的异常数据（不分页，用于导出），结果由服务端游标分批读取"""
+        # 构建带筛选条件的基础查询
+        base_sql, params = _build_filtered_select(adcd, stcd, start_time, end_time, name, status)
+
+        # 排序
+        final_sql = f"{base_sql} ORDER BY tm DESC"
+
+        for rows in db_manager.execute_query_stream(final_sql, tuple(params), fetch_size):
+            yield from _rows_to_items(rows)
+
     @staticmethod
     def get_all_filtered_exceptions(db_manager: UnifiedDatabaseManager, adcd: str = None, stcd: str = None,
                                    start_time: datetime = None, end_time: datetime = None,
                                    name: str = None, status: int = 0) -> List[Dict]:
         """获取所有过滤后的异常数据（不分页，用于导出）"""
         try:
-            # 构建基础查询
-            base_sql = QueryBuilder.build_select(
-                table='TZX_STCD_EXCE',
-                columns=['stcd', 'stnm', 'aid', 'tm', 'val', 'rem',
-                       'insert_tm', 're_name', 'status', 're_time'],
-                where_clause='1=1'
-            )
-
-            # 添加筛选条件
-            conditions = []
-            params = []
-
-            if adcd:
-                conditions.append("AND aid LIKE %s")
-                params.append(f"{adcd}%")
-
-            if stcd:
-                conditions.append("AND stcd = %s")
-                params.append(stcd)
-
-            if name:
-                conditions.append("AND stnm LIKE %s")
-                params.append(f"%{name}%")
-
-            if start_time:
-                conditions.append("AND tm >= %s")
-                params.append(start_time.strftime('%Y-%m-%d %H:%M:%S'))
-
-            if end_time:
-                conditions.append("AND tm <= %s")
-                params.append(end_time.strftime('%Y-%m-%d %H:%M:%S'))
-
-            if status is not None:
-                if status == 0:
-                    conditions.append("AND rem IS NULL")
-                elif status == 1:
-                    conditions.append("AND rem IS NOT NULL")
-                # status == 2 不添加过滤条件
-
-            # 应用筛选条件
-            for condition in conditions:
-                base_sql += f" {condition}"
-
-            # 排序
-            final_sql = f"{base_sql} ORDER BY tm DESC"
-
-            # 执行查询
-            results = db_manager.execute_query(final_sql, tuple(params))
-
-            # 检查查询结果
-            if not results.get('success'):
-                logger.error(f"查询失败: {results.get('error', 'Unknown error')}")
-                return []
-
-            # 转换为字典格式
-            def parse_datetime(value):
-                if value is None:
-                    return None
-                if isinstance(value, datetime):
-                    return value.strftime('%Y-%m-%d %H:%M:%S')
-                if isinstance(value, str):
-                    # 验证并标准化时间格式
-                    try:
-                        dt = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-                        return dt.strftime('%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        return value  # 如果无法解析，返回原值
-                return value
-
-            items = []
-            for row in results['results']:
-                # 根据aid判断市县信息和经度纬度
-                aid = row['aid']
-                shi, xian, lgtd, lttd = get_region_info_by_aid(aid)
-
-                items.append({
-                    'stcd': row['stcd'],
-                    'stnm': row['stnm'],
-                    'aid': row['aid'],
-                    'val': float(row['val']) if row['val'] else None,
-                    'rem': row['rem'],
-                    'tm': parse_datetime(row['tm']),
-                    'insert_tm': parse_datetime(row['insert_tm']),
-                    're_name': row['re_name'],
-                    'status': int(row['status']) if row['status'] else None,
-                    're_time': parse_datetime(row['re_time']),
-                    'shi': shi,
-                    'xian': xian,
-                    'lgtd': lgtd,
-                    'lttd': lttd
-                })
-
-            return items
+            return list(ExceptionData.iter_filtered_exceptions(
+                db_manager, adcd=adcd, stcd=stcd, start_time=start_time,
+                end_time=end_time, name=name, status=status
+            ))
 
         except Exception as e:
-            logger.error(f"获取所有过滤异常数据失败: {e}")
+            logger.error("获取所有过滤异常数据失败: %s", e)
             return []
 
     @staticmethod
@@ -516,41 +623,39 @@ class ExceptionData(BaseModel):
             )
 
             # 调试：记录查询参数
-            formatted_time = tm.strftime('%Y-%m-%d %H:%M:%S')
-            logger.info(f"查询参数: stcd={stcd}, tm={formatted_time}")
-            logger.info(f"执行SQL: {sql}")
+            logger.debug("查询参数: stcd=%s, tm=%s", stcd, tm)
+            logger.debug("执行SQL: %s", sql)
 
-            result = db_manager.execute_query(sql, (stcd, formatted_time))
+            result = db_manager.execute_query(sql, (stcd, tm))
 
             # 调试：记录查询结果
             if result['success']:
                 results = result['results']
-                logger.info(f"查询结果数量: {len(results)}")
-                if len(results) > 0:
-                    logger.info(f"第一条记录: {results[0]}")
-                else:
-                    # 尝试查找所有该测站的记录进行对比
+                logger.debug("查询结果数量: %d", len(results))
+                if results:
+                    logger.debug("第一条记录: %s", results[0])
+                elif logger.isEnabledFor(logging.DEBUG):
+                    # 尝试查找所有该测站的记录进行对比，仅在调试日志开启时执行
                     debug_sql = "SELECT stcd, tm, rem, status FROM TZX_STCD_EXCE WHERE stcd = %s ORDER BY tm DESC LIMIT 5"
                     debug_result = db_manager.execute_query(debug_sql, (stcd,))
-                    debug_results = debug_result['results']
-                    logger.info(f"测站 {stcd} 的所有记录: {debug_results}")
+                    logger.debug("测站 %s 的所有记录: %s", stcd, debug_result['results'])
             else:
-                logger.error(f"查询失败: {result.get('error', '未知错误')}")
+                logger.error("查询失败: %s", result.get('error', '未知错误'))
                 results = []
             if results:
                 return {
                     'stcd': results[0]['stcd'],
                     'stnm': results[0]['stnm'],
                     'aid': results[0]['aid'],
-                    'val': float(results[0]['val']) if results[0]['val'] else None,
+                    'val': _to_float(results[0]['val']),
                     'rem': results[0]['rem'],
-                    'tm': results[0]['tm'] if isinstance(results[0]['tm'], datetime) else datetime.strptime(results[0]['tm'], '%Y-%m-%d %H:%M:%S'),
-                    'insert_tm': results[0]['insert_tm'] if isinstance(results[0]['insert_tm'], datetime) else datetime.strptime(results[0]['insert_tm'], '%Y-%m-%d %H:%M:%S')
+                    'tm': results[0]['tm'],
+                    'insert_tm': results[0]['insert_tm']
                 }
             return None
 
         except Exception as e:
-            logger.error(f"获取异常记录失败: {e}")
+            logger.error("获取异常记录失败: %s", e)
             return None
 
     @staticmethod
@@ -560,24 +665,9 @@ class ExceptionData(BaseModel):
         try:
             # 移除不合理的时间验证，允许处理历史异常数据
             # 注释：异常数据可能是几天前的，不应该用当前时间来限制
-            logger.info(f"准备更新异常记录: 测站={stcd}, 异常时间={tm}")
-
-            # 获取当前记录
-            current_exception = ExceptionData.get_by_station_and_time(db_manager, stcd, tm)
-            if not current_exception:
-                raise ValueError(f"测站 {stcd} 没有待反馈的异常数据")
+            logger.debug("准备更新异常记录: 测站=%s, 异常时间=%s", stcd, tm)
 
-            # 更新记录
-            update_sql = QueryBuilder.build_update(
-                table='TZX_STCD_EXCE',
-                data={
-                    'rem': rem,
-                    're_name': re_name,
-                    'status': status,
-                    're_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                },
-                where_clause='stcd = %s AND tm = %s'
-            )
+            now = datetime.now()
 
             # 直接执行更新，不使用事务管理器避免rollback问题
             # 准备更新数据
@@ -585,19 +675,19 @@ class ExceptionData(BaseModel):
                 'rem': rem,
                 're_name': re_name,
                 'status': status,
-                're_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                're_time': now
             }
 
-            # 重新构建SQL
+            # 构建SQL，待反馈条件放在WHERE中，检查与更新在同一条语句内完成
             update_sql = QueryBuilder.build_update(
                 table='TZX_STCD_EXCE',
                 data=update_data,
-                where_clause='stcd = %s AND tm = %s'
+                where_clause='stcd = %s AND tm = %s AND rem IS NULL AND (status = 0 OR status IS NULL)'
             )
 
             # 准备参数：SET数据参数在前，WHERE条件参数在后
             set_params = tuple(update_data.values())
-            where_params = (stcd, tm.strftime('%Y-%m-%d %H:%M:%S'))
+            where_params = (stcd, tm)
             all_params = set_params + where_params
 
             # 执行更新并获取结果
@@ -608,21 +698,23 @@ class ExceptionData(BaseModel):
                 raise Exception(f"数据库更新失败: {result.get('error', '未知错误')}")
 
             if result['affected_rows'] == 0:
-                raise ValueError(f"未找到匹配的异常记录进行更新，测站={stcd}, 时间={tm}")
+                # 记录不存在或已反馈
+                raise ValueError(f"测站 {stcd} 没有待反馈的异常数据")
 
-            logger.info(f"异常记录更新成功: {stcd}, {tm}, 影响行数: {result['affected_rows']}")
+            logger.info("异常记录更新成功: %s, %s, 影响行数: %s", stcd, tm, result['affected_rows'])
 
+            re_time = now.strftime(DATETIME_FORMAT)
             return {
                 'updated_count': result['affected_rows'],
                 'detail': {
                     'stcd': stcd,
-                    'stnm': current_exception['stnm'],
-                    'exception_time': tm.strftime('%Y-%m-%d %H:%M:%S'),
-                    'old_remark': current_exception['rem'],
+                    'exception_time': tm.strftime(DATETIME_FORMAT),
+                    'old_remark': None,  # 只有尚未反馈（rem为空）的记录会被更新
                     'new_remark': rem,
                     're_name': re_name,
                     'status': status,
-                    're_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    're_time': re_time,
+                    'updated_at': re_time
                 }
             }
 
@@ -630,68 +722,53 @@ class ExceptionData(BaseModel):
             # 重新抛出ValueError，让上层处理
             raise e
         except Exception as e:
-            logger.error(f"更新异常记录失败: {e}")
+            logger.error("更新异常记录失败: %s", e)
             raise e
 
     @staticmethod
-    def get_statistics(db_manager: UnifiedDatabaseManager) -> Dict[str, Any]:
-        """获取异常数据统计信息"""
+    def get_statistics(db_manager: UnifiedDatabaseManager) -> Stats:
+        """获取异常数据统计信息；查询失败时抛出异常，避免全零统计被当作正常结果缓存"""
         try:
-            # 统计待反馈异常数据总数
-            pending_sql = "SELECT COUNT(*) as total_pending FROM TZX_STCD_EXCE WHERE 1=1 AND rem IS NULL"
-            pending_result = db_manager.execute_query(pending_sql)
-            total_pending = pending_result['results'][0]['total_pending'] if pending_result and pending_result.get('success') and pending_result.get('results') else 0
-
-            # 统计涉及的测站数量
-            station_sql = "SELECT COUNT(DISTINCT stcd) as station_count FROM TZX_STCD_EXCE WHERE 1=1 AND rem IS NULL"
-            station_result = db_manager.execute_query(station_sql)
-            station_count = station_result['results'][0]['station_count'] if station_result and station_result.get('success') and station_result.get('results') else 0
-
-            # 统计涉及的团场数量
-            farm_sql = "SELECT COUNT(DISTINCT aid) as farm_count FROM TZX_STCD_EXCE WHERE 1=1 AND rem IS NULL AND aid IS NOT NULL"
-            farm_result = db_manager.execute_query(farm_sql)
-            farm_count = farm_result['results'][0]['farm_count'] if farm_result and farm_result.get('success') and farm_result.get('results') else 0
-
-            # 获取最新异常时间
-            latest_sql = "SELECT MAX(tm) as latest_time FROM TZX_STCD_EXCE WHERE 1=1"
-            latest_result = db_manager.execute_query(latest_sql)
-            latest_time = latest_result['results'][0]['latest_time'] if latest_result and latest_result.get('success') and latest_result.get('results') else None
-
-            return {
-                'total_pending': total_pending,
-                'station_count': station_count,
-                'farm_count': farm_count,
-                'latest_time': latest_time.strftime('%Y-%m-%d %H:%M:%S') if latest_time else None
-            }
+            # 待反馈总数、涉及测站及团场数量、最新异常时间一次扫描得出
+            stats_sql = """
+            SELECT SUM(rem IS NULL) AS total_pending,
+                   COUNT(DISTINCT IF(rem IS NULL, stcd, NULL)) AS station_count,
+                   COUNT(DISTINCT IF(rem IS NULL AND aid IS NOT NULL, aid, NULL)) AS farm_count,
+                   MAX(tm) AS latest_time
+            FROM TZX_STCD_EXCE
+            """
+            stats_result = db_manager.execute_query(stats_sql)
+            if not stats_result['success']:
+                raise Exception(stats_result.get('error', '未知错误'))
+            row = stats_result['results'][0] if stats_result['results'] else {}
+
+            latest_time = row.get('latest_time')
+
+            return Stats(
+                # SUM返回Decimal，空表时为NULL
+                total_pending=int(row.get('total_pending') or 0),
+                station_count=row.get('station_count') or 0,
+                farm_count=row.get('farm_count') or 0,
+                latest_time=latest_time.strftime(DATETIME_FORMAT) if latest_time else None
+            )
 
         except Exception as e:
-            logger.error(f"获取统计信息失败: {e}")
-            return {
-                'total_pending': 0,
-                'station_count': 0,
-                'farm_count': 0,
-                'latest_time': None
-            }
+            logger.error("获取统计信息失败: %s", e)
+            raise
 
     @staticmethod
-    def health_check(db_manager: UnifiedDatabaseManager) -> Dict[str, Any]:
+    def health_check(db_manager: UnifiedDatabaseManager) -> HealthStatus:
         """健康检查"""
         try:
             # 执行简单查询测试连接
             result = db_manager.execute_query("SELECT 1 as health_check FROM TZX_STCD_EXCE LIMIT 1")
 
-            return {
-                'status': 'healthy' if result and result.get('success') else 'unhealthy',
-                'message': '数据库连接正常' if result and result.get('success') else '数据库连接异常',
-                'timestamp': datetime.now().isoformat()
-            }
+            if result and result.get('success'):
+                return HealthStatus('healthy', '数据库连接正常', datetime.now().isoformat())
+            return HealthStatus('unhealthy', '数据库连接异常', datetime.now().isoformat())
 
         except Exception as e:
-            return {
-                'status': 'unhealthy',
-                'message': f'健康检查失败: {str(e)}',
-                'timestamp': datetime.now().isoformat()
-            }
+            return HealthStatus('unhealthy', f'健康检查失败: {str(e)}', datetime.now().isoformat())
 
 
 # 表创建脚本
@@ -703,5 +780,5 @@ def create_all_tables(db_manager: UnifiedDatabaseManager):
         logger.info("所有数据表创建完成")
 
     except Exception as e:
-        logger.error(f"创建数据表失败: {e}")
+        logger.error("创建数据表失败: %s", e)
         raise e
\ No newline at end of file
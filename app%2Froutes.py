@@ -4,27 +4,128 @@
 API路由文件
 """
 
-from flask import Blueprint, request, jsonify, send_file, make_response
+from flask import Blueprint, request, jsonify, send_file, make_response, current_app
 from datetime import datetime
+from urllib.parse import unquote
 from app.models import (
-    ExceptionData, ST_STBPRP_B, AD_CD_B
+    ExceptionData, ST_STBPRP_B, AD_CD_B, _like_prefix
 )
 from app.schemas import (
-    PaginationSchema, UpdateRemarkSchema, ResponseSchema,
+    PAGINATION_SCHEMA, UPDATE_REMARK_SCHEMA, ResponseSchema,
     ExceptionListResponseSchema, UpdateResponseSchema, FarmListResponseSchema
 )
+from app import cache
+from app import xlsx_fast
+from app.validators import ValidationErrors
+from constants import DATETIME_FORMAT
 from marshmallow import ValidationError
 import logging
-import io
-import pandas as pd
+from operator import itemgetter
+import tempfile
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
+
+try:
+    import xlsxwriter
+except ImportError:  # 未安装xlsxwriter时回退到openpyxl
+    xlsxwriter = None
 
 # 创建蓝图
 exception_bp = Blueprint('exception', __name__)
 logger = logging.getLogger(__name__)
 
+# Excel导出样式，所有单元格共享同一组样式对象
+HEADER_FONT = Font(bold=True, color='FFFFFF')
+HEADER_FILL = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+CENTER_ALIGN = Alignment(horizontal='center', vertical='center')
+BOLD_FONT = Font(bold=True)
+
+# 导出列标题
+EXCEL_HEADERS = (
+    '测站编码', '测站名称', '行政区代码', '异常值', '异常时间',
+    '插入时间', '异常原因', '反馈人员', '处理状态', '反馈时间',
+    '经度', '纬度', '县', '市'
+)
+# 各列固定列宽，与原先按内容自适应（上限20）的效果接近，无需写完后再扫描所有单元格
+EXCEL_COLUMN_WIDTHS = (14, 20, 12, 10, 20, 20, 20, 12, 10, 20, 12, 12, 14, 14)
+# 未指定时间范围时使用的默认查询范围
+DEFAULT_BEGIN_TIME = datetime(2020, 1, 1)
+DEFAULT_END_TIME = datetime(2030, 12, 31, 23, 59, 59)
+
+# 导出文件超过该大小后从内存转存到临时文件
+EXCEL_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# 导出列对应的数据字段及缺省值，顺序与EXCEL_HEADERS一致；status列单独转换为文本
+_EXPORT_FIELDS = (
+    ('stcd', ''), ('stnm', ''), ('aid', ''), ('val', 0), ('tm', ''),
+    ('insert_tm', ''), ('rem', ''), ('re_name', ''), ('status', None), ('re_time', ''),
+    ('lgtd', ''), ('lttd', ''), ('xian', ''), ('shi', '')
+)
+# 模型返回的数据项包含全部字段，一次取出整行的值
+_export_values = itemgetter(*(key for key, _ in _EXPORT_FIELDS))
+
+# 导出数据行的状态文本
+_ROW_STATUS_TEXT = {0: '待反馈', 1: '已处理'}
+# 导出信息中查询条件的状态文本，未指定状态时按待反馈处理
+_FILTER_STATUS_TEXT = {None: '待反馈', 0: '待反馈', 1: '已处理', 2: '所有记录'}
+
+# xlsxwriter格式参数，与openpyxl样式保持一致
+_XLSX_HEADER_FORMAT = {
+    'bold': True, 'font_color': 'white', 'bg_color': '#366092',
+    'border': 1, 'align': 'center', 'valign': 'vcenter'
+}
+
+
+# 调试用统计查询，仅在开启SQL_DEBUG时执行
+_DEBUG_COUNT_SQL = """
+SELECT COUNT(*) as total_count,
+       MIN(tm) as earliest_time,
+       MAX(tm) as latest_time
+FROM TZX_STCD_EXCE
+WHERE aid LIKE %s
+  AND tm >= %s
+  AND tm <= %s
+  AND rem IS NULL
+"""
+
+# name参数中出现这些字符说明未被#号截断
+_NAME_SPECIAL_CHARS = frozenset('#()&?')
+
+
+def convert_time_format(time_str):
+    """将 2025-10-10、2025-10-10 08:00 等格式补全为 YYYY-MM-DD HH:MM:SS，其余输入原样返回"""
+    if not time_str:
+        return time_str
+
+    # 处理 2025-10-10 08:00 格式 (缺少秒数)
+    if len(time_str) == 16 and time_str.count('-') == 2 and time_str.count(':') == 1:
+        return f"{time_str}:00"
+
+    # 处理 2025-10-10+08:00 格式 (URL编码的空格)
+    if '+' in time_str and time_str.count('-') == 2 and len(time_str) == 16:
+        date_part = time_str[:10]      # 2025-10-10
+        time_part = time_str[11:16]    # 08:00
+        return f"{date_part} {time_part}:00"
+
+    # 处理只有日期的格式 2025-10-10
+    if len(time_str) == 10 and time_str.count('-') == 2:
+        return f"{time_str} 00:00:00"
+
+    return time_str
+
+
+# 统计接口的响应缓存键，填写异常原因后需要失效
+STATISTICS_CACHE_KEY = 'statistics'
+
+
+def _is_cacheable(response):
+    """只缓存成功响应，错误处理分支返回的是 (响应, 状态码) 元组"""
+    return not isinstance(response, tuple)
+
 
 @exception_bp.route('/getExecStationList', methods=['GET'])
 def getExecStationList():
@@ -34,75 +135,51 @@ def getExecStationList():
         args_dict = request.args.to_dict()
 
         # 打印调试信息
-        logger.info(f"原始参数: {args_dict}")
-
-        # 简单的时间格式转换 (处理多种格式)
-        def convert_time_format(time_str):
-            if not time_str:
-                return time_str
-
-            # 处理 2025-10-10 08:00 格式 (缺少秒数)
-            if len(time_str) == 16 and time_str.count('-') == 2 and time_str.count(':') == 1:
-                return f"{time_str}:00"
-
-            # 处理 2025-10-10+08:00 格式 (URL编码的空格)
-            if '+' in time_str and time_str.count('-') == 2 and len(time_str) == 16:
-                date_part = time_str[:10]      # 2025-10-10
-                time_part = time_str[11:16]    # 08:00
-                return f"{date_part} {time_part}:00"
-
-            # 处理只有日期的格式 2025-10-10
-            if len(time_str) == 10 and time_str.count('-') == 2:
-                return f"{time_str} 00:00:00"
-
-            return time_str
+        logger.info("原始参数: %s", args_dict)
 
         # 转换时间参数
         for param in ['bt', 'et', 'start_time', 'end_time']:
             if param in args_dict:
                 converted = convert_time_format(args_dict[param])
                 if converted != args_dict[param]:
-                    logger.info(f"时间参数转换: {param}: {args_dict[param]} -> {converted}")
+                    logger.info("时间参数转换: %s: %s -> %s", param, args_dict[param], converted)
                 args_dict[param] = converted
 
-        logger.info(f"转换后参数: {args_dict}")
+        logger.info("转换后参数: %s", args_dict)
 
         # 使用转换后的参数进行验证
-        schema = PaginationSchema()
         try:
-            args = schema.load(args_dict)
-        except ValidationError as e:
-            logger.warning(f"参数验证失败: {e.messages}")
+            args = PAGINATION_SCHEMA.load(args_dict)
+        except ValidationErrors as e:
+            logger.warning("参数验证失败: %s", e.errors)
             return jsonify({
                 'code': 400,
                 'message': '请求参数错误',
-                'error': str(e.messages)
+                'error': str(e.errors)
             }), 400
 
-        # 解析参数 - 支持新旧参数名，添加URL解码处理
+        # 解析参数 - 新旧参数名已由PaginationSchema合并，添加URL解码处理
         page = args['page']
         page_size = args['page_size']
-        adcd = args.get('adcd') or args.get('aid')
+        adcd = args['adcd']
         stcd = args.get('stcd')
-        bt = args.get('bt') or args.get('start_time')
-        et = args.get('et') or args.get('end_time')
+        bt = args['bt']
+        et = args['et']
 
         # 对name参数进行URL解码，处理特殊字符
         name = args.get('name')
         if name:
-            from urllib.parse import unquote
-            try:
-                name = unquote(name, encoding='utf-8')
-                logger.info(f"name参数URL解码: {args.get('name')} -> {name}")
-
-                # 检查是否因为#号截断导致不完整
-                if len(name) > 0 and not any(char in name for char in ['#', '(', ')', '&', '?']):
-                    # 如果name参数看起来可能被截断，记录警告
-                    if 'status' not in args:
-                        logger.warning(f"status参数缺失，可能因为#号截断问题。当前name: {name}")
+            # 不含%时不存在URL编码，无需解码
+            if '%' in name:
+                try:
+                    name = unquote(name, encoding='utf-8')
+                    logger.info("name参数URL解码: %s -> %s", args.get('name'), name)
+                except Exception as e:
+                    logger.warning("name参数URL解码失败: %s", e)
 
-            except Exception as e:
-                logger.warning(f"name参数URL解码失败: {e}")
+            # 检查是否因为#号截断导致不完整，如果name参数看起来可能被截断，记录警告
+            if _NAME_SPECIAL_CHARS.isdisjoint(name) and 'status' not in args:
+                logger.warning("status参数缺失，可能因为#号截断问题。当前name: %s", name)
 
         status = args.get('status')
         export = args.get('export')
@@ -111,93 +188,47 @@ def getExecStationList():
         if status is None:
             status = 0
 
-        # 如果没有指定adcd，则查询所有行政区划（重要修复）
-        if adcd is None:
-            adcd = ''  # 空字符串会匹配所有记录
-
         # 如果没有指定时间范围，设置一个很宽的范围（重要修复）
+        # bt/et 已由PaginationSchema解析为datetime，无需再次转换
         if bt is None:
-            bt = '2020-01-01 00:00:00'
+            bt = DEFAULT_BEGIN_TIME
         if et is None:
-            et = '2030-12-31 23:59:59'
+            et = DEFAULT_END_TIME
 
-        logger.info(f"查询异常数据 - 页码: {page}, 每页: {page_size}, 行政区: {adcd}, 时间: {bt} 到 {et}, 状态: {status}")
+        logger.info("查询异常数据 - 页码: %s, 每页: %s, 行政区: %s, 时间: %s 到 %s, 状态: %s", page, page_size, adcd, bt, et, status)
 
         # 获取数据库管理器
-        from flask import current_app
-        db_manager = current_app.config['DATABASE_MANAGER']
-
-        # 调试查询：统计符合基本条件的记录数
-        debug_sql = """
-        SELECT COUNT(*) as total_count,
-               MIN(tm) as earliest_time,
-               MAX(tm) as latest_time
-        FROM TZX_STCD_EXCE
-        WHERE aid LIKE %s
-          AND tm >= %s
-          AND tm <= %s
-          AND rem IS NULL
-        """
-        debug_params = [f"{adcd}%", bt, et]
-        debug_result = db_manager.execute_query(debug_sql, tuple(debug_params))
-        if debug_result['success'] and len(debug_result['results']) > 0:
-            logger.info(f"调试信息 - 符合条件记录数: {debug_result['results'][0]}")
-        else:
-            logger.info("调试信息 - 没有找到符合条件的记录")
+        runtime_cfg = current_app.extensions['runtime_cfg']
+        db_manager = runtime_cfg.db_manager
+
+        # 调试查询：统计符合基本条件的记录数，需额外扫描一次数据，仅在开启SQL_DEBUG时执行
+        if runtime_cfg.sql_debug and logger.isEnabledFor(logging.DEBUG):
+            debug_result = db_manager.execute_query(_DEBUG_COUNT_SQL, (_like_prefix(adcd), bt, et))
+            if debug_result['success'] and len(debug_result['results']) > 0:
+                logger.debug("调试信息 - 符合条件记录数: %s", debug_result['results'][0])
+            else:
+                logger.debug("调试信息 - 没有找到符合条件的记录")
 
         # 如果是导出请求，获取所有数据
-        logger.info(f"检查导出参数: export={export}")
+        logger.info("检查导出参数: export=%s", export)
         if export == 'excel':
-            # 将字符串时间转换为datetime对象
-            bt_dt = datetime.strptime(bt, '%Y-%m-%d %H:%M:%S') if bt else None
-            et_dt = datetime.strptime(et, '%Y-%m-%d %H:%M:%S') if et else None
-
-            all_items = ExceptionData.get_all_filtered_exceptions(
+            # 数据由服务端游标逐批读出并直接写入工作表，不在内存中汇总为列表
+            items = ExceptionData.iter_filtered_exceptions(
                 db_manager, adcd=adcd, stcd=stcd,
-                start_time=bt_dt, end_time=et_dt, name=name, status=status
+                start_time=bt, end_time=et, name=name, status=status
             )
 
-            # 构建导出数据格式
-            export_result = {
-                'total': len(all_items),
-                'page': 1,
-                'page_size': len(all_items),
-                'pages': 1,
-                'items': all_items
-            }
-
-            return generateExcelFile(export_result, adcd, stcd, bt_dt, et_dt, name, status)
-
-        # 将字符串时间转换为datetime对象
-        if bt is not None:
-            if isinstance(bt, str):
-                bt_dt = datetime.strptime(bt, '%Y-%m-%d %H:%M:%S')
-            elif isinstance(bt, datetime):
-                bt_dt = bt
-            else:
-                logger.warning(f"未知的bt参数类型: {type(bt)}, 值: {bt}")
-                bt_dt = None
-        else:
-            bt_dt = None
-
-        if et is not None:
-            if isinstance(et, str):
-                et_dt = datetime.strptime(et, '%Y-%m-%d %H:%M:%S')
-            elif isinstance(et, datetime):
-                et_dt = et
-            else:
-                logger.warning(f"未知的et参数类型: {type(et)}, 值: {et}")
-                et_dt = None
-        else:
-            et_dt = None
+            return generateExcelFile(items, adcd, stcd, bt, et, name, status)
 
         # 查询分页数据
-        logger.info(f"准备调用get_pending_exceptions: page={page}, page_size={page_size}, adcd='{adcd}', status={status}")
+        logger.info("准备调用get_pending_exceptions: page=%s, page_size=%s, adcd='%s', status=%s", page, page_size, adcd, status)
         result = ExceptionData.get_pending_exceptions(
             db_manager, page=page, page_size=page_size,
-            adcd=adcd, stcd=stcd, start_time=bt_dt, end_time=et_dt, name=name, status=status
+            adcd=adcd, stcd=stcd, start_time=bt, end_time=et, name=name, status=status
         )
-        logger.info(f"get_pending_exceptions返回结果: {result}")
+        # 结果中包含整页数据，只有INFO级别生效时才序列化
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("get_pending_exceptions返回结果: %s", result)
 
         # 构建响应
         response_data = {
@@ -206,11 +237,11 @@ def getExecStationList():
             'data': result
         }
 
-        logger.info(f"查询成功，返回 {len(result['items'])} 条记录")
+        logger.info("查询成功，返回 %s 条记录", len(result['items']))
         return jsonify(response_data)
 
     except Exception as e:
-        logger.error(f"查询异常数据失败: {str(e)}")
+        logger.error("查询异常数据失败: %s", e)
         return jsonify({
             'code': 500,
             'message': '服务器内部错误',
@@ -222,31 +253,11 @@ def getExecStationList():
 def remarkExecInfo():
     """填写异常原因API - 完全相同的接口"""
     try:
-        # 时间格式转换函数 - 与getExecStationList保持一致
-        def convert_time_format(time_str):
-            if not time_str:
-                return time_str
-
-            # 处理 2025-10-10 08:00 格式 (缺少秒数)
-            if len(time_str) == 16 and time_str.count('-') == 2 and time_str.count(':') == 1:
-                return f"{time_str}:00"
-
-            # 处理 2025-10-10+08:00 格式 (URL编码的空格)
-            if '+' in time_str and time_str.count('-') == 2 and len(time_str) == 16:
-                date_part = time_str[:10]      # 2025-10-10
-                time_part = time_str[11:16]    # 08:00
-                return f"{date_part} {time_part}:00"
-
-            # 处理只有日期的格式 2025-10-10
-            if len(time_str) == 10 and time_str.count('-') == 2:
-                return f"{time_str} 00:00:00"
-
-            return time_str
-
         # 获取原始数据并进行时间转换
-        logger.info(f"请求表单数据: {dict(request.form)}")
-        logger.info(f"请求Content-Type: {request.content_type}")
-        logger.info(f"请求方法: {request.method}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("请求表单数据: %s", dict(request.form))
+        logger.info("请求Content-Type: %s", request.content_type)
+        logger.info("请求方法: %s", request.method)
 
         raw_data = {
             'stcd': request.form.get('stcd'),
@@ -256,23 +267,22 @@ def remarkExecInfo():
             'status': request.form.get('status')
         }
 
-        logger.info(f"解析的原始数据: {raw_data}")
+        logger.info("解析的原始数据: %s", raw_data)
 
         # 对时间参数进行格式转换
         if raw_data['tm']:
             converted_tm = convert_time_format(raw_data['tm'])
             if converted_tm != raw_data['tm']:
-                logger.info(f"时间参数转换: tm: {raw_data['tm']} -> {converted_tm}")
+                logger.info("时间参数转换: tm: %s -> %s", raw_data['tm'], converted_tm)
                 raw_data['tm'] = converted_tm
 
-        logger.info(f"转换后参数: {raw_data}")
+        logger.info("转换后参数: %s", raw_data)
 
         # 使用转换后的数据进行验证
-        schema = UpdateRemarkSchema()
         try:
-            validated_data = schema.load(raw_data)
+            validated_data = UPDATE_REMARK_SCHEMA.load(raw_data)
         except ValidationError as e:
-            logger.warning(f"参数验证失败: {e.messages}")
+            logger.warning("参数验证失败: %s", e.messages)
             return jsonify({
                 'code': 400,
                 'message': '请求参数错误',
@@ -286,11 +296,10 @@ def remarkExecInfo():
         name = validated_data['name']
         status = validated_data['status']
 
-        logger.info(f"更新异常原因 - 测站: {stcd}, 异常时间: {tm}, 反馈人员: {name}, 状态: {status}")
+        logger.info("更新异常原因 - 测站: %s, 异常时间: %s, 反馈人员: %s, 状态: %s", stcd, tm, name, status)
 
         # 获取数据库管理器
-        from flask import current_app
-        db_manager = current_app.config['DATABASE_MANAGER']
+        db_manager = current_app.extensions['runtime_cfg'].db_manager
 
         # 更新数据库 - 使用pymysql版本
         result = ExceptionData.update_remark(
@@ -310,11 +319,14 @@ def remarkExecInfo():
             }
         }
 
-        logger.info(f"更新成功，测站: {stcd}, 异常时间: {result['detail']['exception_time']}")
+        # 待反馈数量已变化，丢弃缓存的统计结果
+        cache.delete(STATISTICS_CACHE_KEY)
+
+        logger.info("更新成功，测站: %s, 异常时间: %s", stcd, result['detail']['exception_time'])
         return jsonify(response_data)
 
     except ValueError as e:
-        logger.warning(f"更新失败: {str(e)}")
+        logger.warning("更新失败: %s", e)
         if '没有待反馈的异常数据' in str(e):
             return jsonify({
                 'code': 1001,
@@ -324,24 +336,6 @@ def remarkExecInfo():
                 'suggestion': '请检查测站编码和异常时间是否正确，或该异常数据可能已经被处理过',
                 'action': '建议：1. 核对测站编码 2. 确认异常时间精确到秒 3. 检查数据是否已被处理'
             }), 200
-        elif '异常时间不匹配' in str(e):
-            return jsonify({
-                'code': 1002,
-                'success': False,
-                'message': '异常时间不匹配',
-                'error': str(e),
-                'suggestion': '请确认要处理的异常时间是否正确，或联系管理员处理',
-                'action': '建议：1. 检查时间格式是否为 YYYY-MM-DD HH:MM:SS 2. 确认时间精确到秒'
-            }), 200
-        elif '未找到匹配的异常记录' in str(e):
-            return jsonify({
-                'code': 1003,
-                'success': False,
-                'message': '未找到匹配的异常记录',
-                'error': str(e),
-                'suggestion': '请检查异常时间是否准确，或查看可用异常时间列表',
-                'action': '建议：1. 确认测站编码正确 2. 检查异常时间是否准确 3. 确认数据存在且未处理'
-            }), 200
         else:
             return jsonify({
                 'code': 400,
@@ -351,7 +345,7 @@ def remarkExecInfo():
             }), 200
 
     except Exception as e:
-        logger.error(f"更新异常原因失败: {str(e)}")
+        logger.error("更新异常原因失败: %s", e)
         return jsonify({
             'code': 500,
             'message': '服务器内部错误',
@@ -360,14 +354,14 @@ def remarkExecInfo():
 
 
 @exception_bp.route('/farms', methods=['GET'])
+@cache.cached(timeout=60, key_prefix='farms', response_filter=_is_cacheable)
 def getFarmList():
     """获取团场列表API - 完全相同的接口"""
     try:
         logger.info("获取团场列表")
 
         # 获取数据库管理器
-        from flask import current_app
-        db_manager = current_app.config['DATABASE_MANAGER']
+        db_manager = current_app.extensions['runtime_cfg'].db_manager
 
         # 查询团场数据 - 使用AD_CD_B类
         farms = AD_CD_B.get_all_regions(db_manager)
@@ -379,11 +373,11 @@ def getFarmList():
             'data': farms
         }
 
-        logger.info(f"查询成功，返回 {len(farms)} 个团场")
+        logger.info("查询成功，返回 %s 个团场", len(farms))
         return jsonify(response_data)
 
     except Exception as e:
-        logger.error(f"获取团场列表失败: {str(e)}")
+        logger.error("获取团场列表失败: %s", e)
         return jsonify({
             'code': 500,
             'message': '服务器内部错误',
@@ -392,14 +386,14 @@ def getFarmList():
 
 
 @exception_bp.route('/exception-data/statistics', methods=['GET'])
+@cache.cached(timeout=30, key_prefix=STATISTICS_CACHE_KEY, response_filter=_is_cacheable)
 def getStatistics():
     """获取异常数据统计信息API - 完全相同的接口"""
     try:
         logger.info("获取异常数据统计信息")
 
         # 获取数据库管理器
-        from flask import current_app
-        db_manager = current_app.config['DATABASE_MANAGER']
+        db_manager = current_app.extensions['runtime_cfg'].db_manager
 
         # 获取统计信息
         stats = ExceptionData.get_statistics(db_manager)
@@ -408,14 +402,14 @@ def getStatistics():
         response_data = {
             'code': 200,
             'message': '查询成功',
-            'data': stats
+            'data': stats._asdict()
         }
 
-        logger.info(f"统计完成 - 待反馈总数: {stats['total_pending']}, 测站数: {stats['station_count']}, 团场数: {stats['farm_count']}")
+        logger.info("统计完成 - 待反馈总数: %s, 测站数: %s, 团场数: %s", stats.total_pending, stats.station_count, stats.farm_count)
         return jsonify(response_data)
 
     except Exception as e:
-        logger.error(f"获取统计信息失败: {str(e)}")
+        logger.error("获取统计信息失败: %s", e)
         return jsonify({
             'code': 500,
             'message': '服务器内部错误',
@@ -430,8 +424,7 @@ def healthCheck():
         logger.info("执行健康检查")
 
         # 获取数据库管理器
-        from flask import current_app
-        db_manager = current_app.config['DATABASE_MANAGER']
+        db_manager = current_app.extensions['runtime_cfg'].db_manager
 
         # 执行健康检查
         health_result = ExceptionData.health_check(db_manager)
@@ -440,14 +433,14 @@ def healthCheck():
         response_data = {
             'code': 200,
             'message': 'API服务正常运行',
-            'data': health_result
+            'data': health_result._asdict()
         }
 
-        logger.info(f"健康检查完成 - 状态: {health_result['status']}")
+        logger.info("健康检查完成 - 状态: %s", health_result.status)
         return jsonify(response_data)
 
     except Exception as e:
-        logger.error(f"健康检查失败: {str(e)}")
+        logger.error("健康检查失败: %s", e)
         return jsonify({
             'code': 500,
             'message': '健康检查失败',
@@ -455,103 +448,40 @@ def healthCheck():
         }), 500
 
 
-def generateExcelFile(result, adcd=None, stcd=None, bt=None, et=None, name=None, status=None):
-    """生成Excel文件用于异常数据导出 - 完全相同的函数"""
+def generateExcelFile(items, adcd=None, stcd=None, bt=None, et=None, name=None, status=None):
+    """生成Excel文件用于异常数据导出 - items可以是任意可迭代对象，只遍历一次"""
     try:
-        # 创建工作簿
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "异常数据"
-
-        # 定义列标题
-        headers = [
-            '测站编码', '测站名称', '行政区代码', '异常值', '异常时间',
-            '插入时间', '异常原因', '反馈人员', '处理状态', '反馈时间',
-            '经度', '纬度', '县', '市'
-        ]
-
-        # 添加标题行
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.font = Font(bold=True, color='FFFFFF')
-            cell.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-            cell.border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        # 填充数据
-        for row_num, item in enumerate(result['items'], 2):
-            # 状态文本映射
-            status_text = '待反馈' if item.get('status') == 0 else '已处理' if item.get('status') == 1 else '未知状态'
-
-            data_row = [
-                item.get('stcd', ''),
-                item.get('stnm', ''),
-                item.get('aid', ''),
-                item.get('val', 0),
-                item.get('tm', ''),
-                item.get('insert_tm', ''),
-                item.get('rem', ''),
-                item.get('re_name', ''),
-                status_text,
-                item.get('re_time', ''),
-                item.get('lgtd', ''),
-                item.get('lttd', ''),
-                item.get('xian', ''),
-                item.get('shi', '')
+        # 筛选条件信息，记录数在数据写完后才能确定，因此导出信息表最后写入
+        def info_data(row_count):
+            return [
+                ['导出时间', datetime.now().strftime(DATETIME_FORMAT)],
+                ['总记录数', row_count],
+                ['当前页记录数', row_count],
+                ['政区代码', adcd or '全部'],
+                ['测站编码', stcd or '全部'],
+                ['测站名称', name or '全部'],
+                ['起始时间', bt.strftime(DATETIME_FORMAT) if bt else '全部'],
+                ['终止时间', et.strftime(DATETIME_FORMAT) if et else '全部'],
+                ['状态', _getStatusText(status)]
             ]
 
-            for col_num, value in enumerate(data_row, 1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.border = Border(
-                    left=Side(style='thin'), right=Side(style='thin'),
-                    top=Side(style='thin'), bottom=Side(style='thin')
-                )
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        # 自动调整列宽
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 20)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # 添加筛选条件信息
-        ws_info = wb.create_sheet(title="导出信息")
-        info_data = [
-            ['导出时间', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-            ['总记录数', result.get('total', 0)],
-            ['当前页记录数', len(result.get('items', []))],
-            ['政区代码', adcd or '全部'],
-            ['测站编码', stcd or '全部'],
-            ['测站名称', name or '全部'],
-            ['起始时间', bt.strftime('%Y-%m-%d %H:%M:%S') if bt else '全部'],
-            ['终止时间', et.strftime('%Y-%m-%d %H:%M:%S') if et else '全部'],
-            ['状态', _getStatusText(status)]
-        ]
-
-        for row_num, (label, value) in enumerate(info_data, 1):
-            ws_info.cell(row=row_num, column=1, value=label).font = Font(bold=True)
-            ws_info.cell(row=row_num, column=2, value=value)
-
-        # 将工作簿保存到内存中的字节流
-        excel_file = io.BytesIO()
-        wb.save(excel_file)
+        # 小文件保存在内存中，超过阈值自动转存磁盘，避免大导出占满工作进程内存
+        excel_file = tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_SIZE, suffix='.xlsx')
+        engine = current_app.extensions['runtime_cfg'].excel_engine
+        if engine == 'fast':
+            row_count = _writeExcelFast(excel_file, items, info_data)
+        elif engine == 'xlsxwriter' and xlsxwriter is not None:
+            row_count = _writeExcelXlsxwriter(excel_file, items, info_data)
+        else:
+            row_count = _writeExcelOpenpyxl(excel_file, items, info_data)
+        excel_size = excel_file.tell()
         excel_file.seek(0)
 
         # 生成文件名
         filename = f"异常数据导出_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
         # 记录导出日志
-        logger.info(f"Excel文件导出成功 - 文件名: {filename}, 记录数: {len(result.get('items', []))}")
+        logger.info("Excel文件导出成功 - 文件名: %s, 记录数: %s", filename, row_count)
 
         # 返回文件下载响应
         response = make_response(
@@ -564,6 +494,7 @@ def generateExcelFile(result, adcd=None, stcd=None, bt=None, et=None, name=None,
         )
 
         # 添加响应头
+        response.headers['Content-Length'] = str(excel_size)
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
@@ -571,7 +502,7 @@ def generateExcelFile(result, adcd=None, stcd=None, bt=None, et=None, name=None,
         return response
 
     except Exception as e:
-        logger.error(f"生成Excel文件失败: {str(e)}")
+        logger.error("生成Excel文件失败: %s", e)
         return jsonify({
             'code': 500,
             'message': 'Excel文件生成失败',
@@ -579,17 +510,92 @@ def generateExcelFile(result, adcd=None, stcd=None, bt=None, et=None, name=None,
         }), 500
 
 
+def _exportRow(item):
+    """将一条异常数据转换为导出行"""
+    try:
+        row = list(_export_values(item))
+    except KeyError:
+        # 缺少字段时按缺省值补齐
+        row = [item.get(key, default) for key, default in _EXPORT_FIELDS]
+    row[8] = _ROW_STATUS_TEXT.get(row[8], '未知状态')
+    return row
+
+
+def _writeExcelFast(excel_file, items, info_data):
+    """直接生成xlsx的XML写出Excel，不创建单元格对象，返回数据行数"""
+    with xlsx_fast.FastXlsxWorkbook(excel_file) as wb:
+        row_count = wb.write_sheet('异常数据', map(_exportRow, items),
+                                   header=EXCEL_HEADERS, column_widths=EXCEL_COLUMN_WIDTHS)
+        wb.write_sheet('导出信息', info_data(row_count), first_column_style=xlsx_fast.STYLE_BOLD)
+    return row_count
+
+
+def _writeExcelXlsxwriter(excel_file, items, info_data):
+    """使用xlsxwriter写出Excel，constant_memory模式下逐行写出并释放已写入的行，返回数据行数"""
+    wb = xlsxwriter.Workbook(excel_file, {'constant_memory': True})
+    header_format = wb.add_format(_XLSX_HEADER_FORMAT)
+    bold_format = wb.add_format({'bold': True})
+
+    ws = wb.add_worksheet('异常数据')
+    for col_num, width in enumerate(EXCEL_COLUMN_WIDTHS):
+        ws.set_column(col_num, col_num, width)
+    ws.write_row(0, 0, EXCEL_HEADERS, header_format)
+
+    write_row = ws.write_row
+    row_count = 0
+    for row_count, item in enumerate(items, 1):
+        write_row(row_count, 0, _exportRow(item))
+
+    ws_info = wb.add_worksheet('导出信息')
+    for row_num, (label, value) in enumerate(info_data(row_count)):
+        ws_info.write(row_num, 0, label, bold_format)
+        ws_info.write(row_num, 1, value)
+
+    wb.close()
+    return row_count
+
+
+def _writeExcelOpenpyxl(excel_file, items, info_data):
+    """使用openpyxl只写模式写出Excel，未安装xlsxwriter时使用，返回数据行数"""
+    # 创建只写工作簿，数据行直接写入底层XML而不在内存中保留单元格对象
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="异常数据")
+
+    # 只写模式下列宽需在写入数据前设置
+    for col_num, width in enumerate(EXCEL_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = width
+
+    # 添加标题行
+    header_cells = []
+    for header in EXCEL_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.border = THIN_BORDER
+        cell.alignment = CENTER_ALIGN
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # 填充数据
+    append = ws.append
+    row_count = 0
+    for item in items:
+        append(_exportRow(item))
+        row_count += 1
+
+    # 添加筛选条件信息
+    ws_info = wb.create_sheet(title="导出信息")
+    for label, value in info_data(row_count):
+        label_cell = WriteOnlyCell(ws_info, value=label)
+        label_cell.font = BOLD_FONT
+        ws_info.append([label_cell, value])
+
+    wb.save(excel_file)
+    return row_count
+
+
 def _getStatusText(status):
     """获取状态文本 - 完全相同的函数"""
-    if status is None:
-        return '待反馈'
-    elif status == 0:
-        return '待反馈'
-    elif status == 1:
-        return '已处理'
-    elif status == 2:
-        return '所有记录'
-    else:
-        return '未知状态'
+    return _FILTER_STATUS_TEXT.get(status, '未知状态')
 
 
@@ -1,70 +1,73 @@
 from marshmallow import Schema, fields, validate, validates, ValidationError
 from datetime import datetime
 
+from app import validators
+from constants import DATETIME_FORMAT
+
 class ExceptionDataSchema(Schema):
     """异常数据序列化模式"""
     stcd = fields.String(required=True, validate=validate.Length(min=1, max=50))
     stnm = fields.String(required=True, validate=validate.Length(min=1, max=100))
     aid = fields.String(required=False)
     val = fields.Float(required=True)
-    tm = fields.DateTime(required=True, format='%Y-%m-%d %H:%M:%S')
-    insert_tm = fields.DateTime(required=False, format='%Y-%m-%d %H:%M:%S')
-
-class PaginationSchema(Schema):
-    """分页参数模式"""
-    page = fields.Integer(required=False, load_default=1, validate=validate.Range(min=1))
-    page_size = fields.Integer(
-        required=False,
-        load_default=20,
-        validate=validate.Range(min=1, max=100)
-    )
-    # 政区代码 - 支持新旧参数名
-    adcd = fields.String(required=False, validate=validate.Length(max=20))
-    aid = fields.String(required=False, validate=validate.Length(max=20))
-
-    # 测站编码
-    stcd = fields.String(required=False, validate=validate.Length(max=50))
-
-    # 时间范围 - 支持新旧参数名
-    bt = fields.DateTime(
-        required=False,
-        format='%Y-%m-%d %H:%M:%S',
-        allow_none=True
-    )
-    et = fields.DateTime(
-        required=False,
-        format='%Y-%m-%d %H:%M:%S',
-        allow_none=True
-    )
-    start_time = fields.DateTime(
-        required=False,
-        format='%Y-%m-%d %H:%M:%S',
-        allow_none=True
-    )
-    end_time = fields.DateTime(
-        required=False,
-        format='%Y-%m-%d %H:%M:%S',
-        allow_none=True
-    )
+    tm = fields.DateTime(required=True, format=DATETIME_FORMAT)
+    insert_tm = fields.DateTime(required=False, format=DATETIME_FORMAT)
+
+class PaginationSchema(validators.Schema):
+    """分页参数模式 - 列表接口调用频繁，使用原生验证器以避免marshmallow的加载开销
+
+    验证失败时抛出 app.validators.ValidationErrors，400响应中的错误信息为原生验证器的中文提示
+    （如 "page必须是整数"、"未知字段"），不再是marshmallow的英文提示
+    """
 
-    # 新增参数
-    name = fields.String(required=False, validate=validate.Length(max=100))
-    status = fields.Integer(required=False, validate=validate.OneOf([0, 1, 2]), missing=0)
-    export = fields.String(required=False, validate=validate.OneOf(['excel']), allow_none=True)
+    # 与原marshmallow模式一致，未定义的查询参数视为错误，整数参数不接受"1.5"之类的字符串
+    allow_unknown = False
+
+    def _setup_fields(self):
+        self.add_field('page', validators.IntegerField(default=1, min_value=1, strict_str=True))
+        self.add_field('page_size', validators.IntegerField(default=20, min_value=1, max_value=100, strict_str=True))
+
+        # 政区代码 - 支持新旧参数名
+        self.add_field('adcd', validators.StringField(max_length=20, allow_none=True))
+        self.add_field('aid', validators.StringField(max_length=20, allow_none=True))
+
+        # 测站编码
+        self.add_field('stcd', validators.StringField(max_length=50, allow_none=True))
+
+        # 时间范围 - 支持新旧参数名
+        for time_field in ('bt', 'et', 'start_time', 'end_time'):
+            self.add_field(time_field, validators.DateTimeField(format=DATETIME_FORMAT, allow_none=True))
+
+        # 新增参数
+        self.add_field('name', validators.StringField(max_length=100, allow_none=True))
+        self.add_field('status', validators.IntegerField(default=0, min_value=0, max_value=2, strict_str=True))
+        self.add_field('export', validators.ChoiceField(['excel'], allow_none=True))
 
     # 时间验证将在路由逻辑中处理，以避免参数名冲突
 
+    def post_load(self, data):
+        """合并新旧参数名，结果中只保留 adcd、bt、et；未指定adcd时为空字符串（匹配所有记录）"""
+        aid, start_time, end_time = data.pop('aid'), data.pop('start_time'), data.pop('end_time')
+        data['adcd'] = data['adcd'] or aid or ''
+        data['bt'] = data['bt'] or start_time
+        data['et'] = data['et'] or end_time
+        return data
+
 class UpdateRemarkSchema(Schema):
     """更新异常原因模式"""
     stcd = fields.String(required=True, validate=validate.Length(min=1, max=50))
     rem = fields.String(required=True, validate=validate.Length(min=1, max=500))
     tm = fields.DateTime(
         required=True,
-        format='%Y-%m-%d %H:%M:%S'
+        format=DATETIME_FORMAT
     )
     name = fields.String(required=True, validate=validate.Length(min=1, max=100))
     status = fields.Integer(required=True, validate=validate.Range(min=0, max=10))
 
+# 模式实例不保存请求状态，模块加载时创建一次供各请求复用
+PAGINATION_SCHEMA = PaginationSchema()
+UPDATE_REMARK_SCHEMA = UpdateRemarkSchema()
+
 class FarmSchema(Schema):
     """团场信息模式"""
     aid = fields.String(required=True)
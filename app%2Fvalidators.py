@@ -6,8 +6,31 @@
 """
 
 import re
+import sys
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Optional, Tuple, Callable
+
+from constants import DATETIME_FORMAT
+
+
+def _parse_fixed_datetime(value: str) -> Optional[datetime]:
+    """
+    按 '%Y-%m-%d %H:%M:%S' 解析19位定长字符串
+    位数、分隔符不符或日期无效时返回None，由调用方交给strptime处理
+    """
+    if (len(value) != 19 or value[4] != '-' or value[7] != '-' or value[10] != ' '
+            or value[13] != ':' or value[16] != ':'):
+        return None
+    year, month, day = value[0:4], value[5:7], value[8:10]
+    hour, minute, second = value[11:13], value[14:16], value[17:19]
+    # int()接受正负号和空白，先确认每段都是数字，保持与strptime一致
+    if not (year.isdigit() and month.isdigit() and day.isdigit()
+            and hour.isdigit() and minute.isdigit() and second.isdigit()):
+        return None
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
 
 
 class ValidationError(Exception):
@@ -25,9 +48,38 @@ class ValidationErrors(Exception):
         super().__init__(f"验证失败: {errors}")
 
 
+def _defining_class(cls: type, name: str) -> type:
+    """返回cls的MRO中定义了name属性的类"""
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+    return None
+
+
+def _has_fast_path(cls: type) -> bool:
+    """
+    字段类型能否直接调用_value_or_error代替validate
+    覆盖了validate，或在定义快速路径之后的子类中又覆盖了_validate_value时不能，否则子类的验证逻辑会被跳过
+    """
+    if cls.validate is not FieldValidator.validate:
+        return False
+    fast_owner = _defining_class(cls, '_value_or_error')
+    return fast_owner is FieldValidator or issubclass(fast_owner, _defining_class(cls, '_validate_value'))
+
+
 class FieldValidator:
     """字段验证器基类"""
 
+    # 字段属性固定，子类同样声明__slots__，实例不再带__dict__
+    __slots__ = ('required', 'default', 'allow_none', 'field_name')
+
+    # 是否可以走 (值, 错误信息) 的快速路径，定义子类时自动判断
+    _fast_path = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fast_path = _has_fast_path(cls)
+
     def __init__(self, required: bool = False, default: Any = None,
                  allow_none: bool = False, field_name: str = None):
         self.required = required
@@ -39,15 +91,47 @@ class FieldValidator:
         """验证字段值"""
         # 处理None值
         if value is None:
-            if self.required and not self.allow_none:
-                raise ValidationError(f"{self.field_name or '字段'}是必填的", self.field_name)
-            if not self.allow_none:
-                raise ValidationError(f"{self.field_name or '字段'}不能为空", self.field_name)
+            error = self._none_error()
+            if error is not None:
+                raise ValidationError(error, self.field_name)
             return None
 
         # 执行具体验证逻辑
         return self._validate_value(value)
 
+    def validate_or_error(self, value: Any) -> Tuple[Any, Optional[str]]:
+        """
+        验证字段值，返回 (值, 错误信息)，验证通过时错误信息为None
+        不抛出异常，供Schema.load逐字段收集错误
+        """
+        if not self._fast_path:
+            try:
+                return self.validate(value), None
+            except ValidationError as e:
+                return None, e.message
+            except Exception as e:
+                return None, f"验证错误: {str(e)}"
+        if value is None:
+            return None, self._none_error()
+        return self._value_or_error(value)
+
+    def _none_error(self) -> Optional[str]:
+        """值为None时的错误信息，允许为空时返回None"""
+        if self.allow_none:
+            return None
+        if self.required:
+            return f"{self.field_name or '字段'}是必填的"
+        return f"{self.field_name or '字段'}不能为空"
+
+    def _value_or_error(self, value: Any) -> Tuple[Any, Optional[str]]:
+        """非None值的验证，默认包装_validate_value；常用字段直接返回错误信息，不经过异常"""
+        try:
+            return self._validate_value(value), None
+        except ValidationError as e:
+            return None, e.message
+        except Exception as e:
+            return None, f"验证错误: {str(e)}"
+
     def _validate_value(self, value: Any) -> Any:
         """子类实现的验证逻辑"""
         raise NotImplementedError
@@ -64,91 +148,124 @@ class FieldValidator:
 class StringField(FieldValidator):
     """字符串字段验证器"""
 
+    __slots__ = ('min_length', 'max_length', 'pattern', '_pattern_re')
+
     def __init__(self, min_length: int = None, max_length: int = None,
                  pattern: str = None, **kwargs):
         self.min_length = min_length
         self.max_length = max_length
         self.pattern = pattern
+        # 正则在构造时编译一次，pattern属性保留原始字符串
+        self._pattern_re = re.compile(pattern) if pattern else None
         super().__init__(**kwargs)
 
     def _validate_value(self, value: Any) -> str:
-        if not isinstance(value, str):
-            value = str(value)
+        value, error = self._value_or_error(value)
+        if error is not None:
+            raise ValidationError(error, self.field_name)
+        return value
+
+    def _value_or_error(self, value: Any) -> Tuple[Optional[str], Optional[str]]:
+        # 先比较精确类型，只有子类等少见情况才走isinstance
+        if type(value) is not str and not isinstance(value, str):
+            try:
+                value = str(value)
+            except Exception as e:
+                return None, f"验证错误: {str(e)}"
 
         length = len(value)
 
         if self.min_length is not None and length < self.min_length:
-            raise ValidationError(
-                f"{self.field_name}长度不能少于{self.min_length}个字符",
-                self.field_name
-            )
+            return None, f"{self.field_name}长度不能少于{self.min_length}个字符"
 
         if self.max_length is not None and length > self.max_length:
-            raise ValidationError(
-                f"{self.field_name}长度不能超过{self.max_length}个字符",
-                self.field_name
-            )
+            return None, f"{self.field_name}长度不能超过{self.max_length}个字符"
 
-        if self.pattern and not re.match(self.pattern, value):
-            raise ValidationError(
-                f"{self.field_name}格式不正确",
-                self.field_name
-            )
+        if self._pattern_re is not None and self._pattern_re.match(value) is None:
+            return None, f"{self.field_name}格式不正确"
 
-        return value
+        return value, None
 
 
 class IntegerField(FieldValidator):
-    """整数字段验证器"""
+    """整数字段验证器
 
-    def __init__(self, min_value: int = None, max_value: int = None, **kwargs):
+    strict_str=True 时字符串必须是整数字面量（与marshmallow.fields.Integer一致），
+    默认仍按浮点数解析后截断，如 "1.5" 转换为 1
+    """
+
+    __slots__ = ('min_value', 'max_value', 'strict_str', '_range')
+
+    def __init__(self, min_value: int = None, max_value: int = None, strict_str: bool = False, **kwargs):
         self.min_value = min_value
         self.max_value = max_value
+        self.strict_str = strict_str
+        # 两端都有界时预先取出上下界，合法值只需一次链式比较
+        self._range = (min_value, max_value) if min_value is not None and max_value is not None else None
         super().__init__(**kwargs)
 
     def _validate_value(self, value: Any) -> int:
-        try:
-            if isinstance(value, bool):
-                value = int(value)
-            elif not isinstance(value, int):
-                value = int(float(value))
-        except (ValueError, TypeError):
-            raise ValidationError(
-                f"{self.field_name}必须是整数",
-                self.field_name
-            )
+        value, error = self._value_or_error(value)
+        if error is not None:
+            raise ValidationError(error, self.field_name)
+        return value
+
+    def _value_or_error(self, value: Any) -> Tuple[Optional[int], Optional[str]]:
+        value_type = type(value)
+        if value_type is not int:
+            try:
+                # bool不能被继承，精确类型比较即可
+                if value_type is bool:
+                    value = int(value)
+                elif value_type is str and self.strict_str:
+                    # "1.5"、"1e3"等非整数字符串视为错误
+                    value = int(value)
+                elif not isinstance(value, int):
+                    value = int(float(value))
+            except (ValueError, TypeError):
+                return None, f"{self.field_name}必须是整数"
+            except Exception as e:
+                return None, f"验证错误: {str(e)}"
+
+        bounds = self._range
+        if bounds is not None and bounds[0] <= value <= bounds[1]:
+            return value, None
 
         if self.min_value is not None and value < self.min_value:
-            raise ValidationError(
-                f"{self.field_name}不能小于{self.min_value}",
-                self.field_name
-            )
+            return None, f"{self.field_name}不能小于{self.min_value}"
 
         if self.max_value is not None and value > self.max_value:
-            raise ValidationError(
-                f"{self.field_name}不能大于{self.max_value}",
-                self.field_name
-            )
+            return None, f"{self.field_name}不能大于{self.max_value}"
 
-        return value
+        return value, None
 
 
 class FloatField(FieldValidator):
     """浮点数字段验证器"""
 
+    __slots__ = ('min_value', 'max_value')
+
     def __init__(self, min_value: float = None, max_value: float = None, **kwargs):
         self.min_value = min_value
         self.max_value = max_value
         super().__init__(**kwargs)
 
     def _validate_value(self, value: Any) -> float:
+        value, error = self._value_or_error(value)
+        if error is not None:
+            raise ValidationError(error, self.field_name)
+        return value
+
+    def _value_or_error(self, value: Any) -> Tuple[Optional[float], Optional[str]]:
+        # 已是float时原样返回，不再调用float()
+        if type(value) is float:
+            return value, None
         try:
-            return float(value)
+            return float(value), None
         except (ValueError, TypeError):
-            raise ValidationError(
-                f"{self.field_name}必须是数字",
-                self.field_name
-            )
+            return None, f"{self.field_name}必须是数字"
+        except Exception as e:
+            return None, f"验证错误: {str(e)}"
 
     def _validate_range(self, value: float):
         if self.min_value is not None and value < self.min_value:
@@ -169,19 +286,32 @@ class FloatField(FieldValidator):
 class DateTimeField(FieldValidator):
     """日期时间字段验证器"""
 
-    def __init__(self, format: str = '%Y-%m-%d %H:%M:%S', **kwargs):
+    __slots__ = ('format', '_fast_parse')
+
+    def __init__(self, format: str = DATETIME_FORMAT, **kwargs):
         self.format = format
+        # 最常用的日期时间格式按固定位置切片解析，不经过strptime
+        self._fast_parse = format == DATETIME_FORMAT
         super().__init__(**kwargs)
 
     def _validate_value(self, value: Any) -> datetime:
-        if isinstance(value, datetime):
+        value_type = type(value)
+        if value_type is datetime:
             return value
 
-        if not isinstance(value, str):
-            raise ValidationError(
-                f"{self.field_name}必须是字符串或datetime对象",
-                self.field_name
-            )
+        if value_type is not str:
+            if isinstance(value, datetime):
+                return value
+            if not isinstance(value, str):
+                raise ValidationError(
+                    f"{self.field_name}必须是字符串或datetime对象",
+                    self.field_name
+                )
+
+        if self._fast_parse:
+            parsed = _parse_fixed_datetime(value)
+            if parsed is not None:
+                return parsed
 
         try:
             return datetime.strptime(value, self.format)
@@ -195,52 +325,79 @@ class DateTimeField(FieldValidator):
 class ChoiceField(FieldValidator):
     """选择字段验证器"""
 
+    __slots__ = ('choices', '_choice_set', '_choices_text')
+
     def __init__(self, choices: List[Any], **kwargs):
         self.choices = choices
+        # 可哈希的选项预先建成集合，成员判断不再逐个比较；含不可哈希选项时仍按列表判断
+        try:
+            self._choice_set = frozenset(choices)
+        except TypeError:
+            self._choice_set = None
+        # 错误信息中的选项列表只格式化一次
+        self._choices_text = str(choices)
         super().__init__(**kwargs)
 
     def _validate_value(self, value: Any) -> Any:
-        if value not in self.choices:
-            raise ValidationError(
-                f"{self.field_name}必须是以下值之一: {self.choices}",
-                self.field_name
-            )
+        value, error = self._value_or_error(value)
+        if error is not None:
+            raise ValidationError(error, self.field_name)
         return value
 
+    def _value_or_error(self, value: Any) -> Tuple[Any, Optional[str]]:
+        if self._choice_set is not None:
+            try:
+                if value in self._choice_set:
+                    return value, None
+                return None, f"{self.field_name}必须是以下值之一: {self._choices_text}"
+            except TypeError:
+                # 不可哈希的输入值，退回列表比较
+                pass
+        if value in self.choices:
+            return value, None
+        return None, f"{self.field_name}必须是以下值之一: {self._choices_text}"
+
 
 class ListField(FieldValidator):
     """列表字段验证器"""
 
+    __slots__ = ('inner_field',)
+
     def __init__(self, inner_field: FieldValidator, **kwargs):
         self.inner_field = inner_field
         super().__init__(**kwargs)
 
     def _validate_value(self, value: Any) -> List[Any]:
-        if not isinstance(value, list):
-            raise ValidationError(
-                f"{self.field_name}必须是列表",
-                self.field_name
-            )
+        value, error = self._value_or_error(value)
+        if error is not None:
+            raise ValidationError(error, self.field_name)
+        return value
 
+    def _value_or_error(self, value: Any) -> Tuple[Optional[List[Any]], Optional[str]]:
+        if type(value) is not list and not isinstance(value, list):
+            return None, f"{self.field_name}必须是列表"
+
+        # 内层字段的验证方法只查找一次，逐项按 (值, 错误信息) 判断；
+        # 覆盖了validate或_validate_value的内层字段由validate_or_error调用validate
+        check = self.inner_field.validate_or_error
         validated_list = []
+        append = validated_list.append
         for i, item in enumerate(value):
-            try:
-                validated_item = self.inner_field.validate(item)
-                validated_list.append(validated_item)
-            except ValidationError as e:
-                raise ValidationError(
-                    f"{self.field_name}[{i}]验证失败: {e.message}",
-                    self.field_name
-                )
+            item, error = check(item)
+            if error is not None:
+                return None, f"{self.field_name}[{i}]验证失败: {error}"
+            append(item)
 
-        return validated_list
+        return validated_list, None
 
 
 class DictField(FieldValidator):
     """字典字段验证器"""
 
+    __slots__ = ()
+
     def _validate_value(self, value: Any) -> Dict[str, Any]:
-        if not isinstance(value, dict):
+        if type(value) is not dict and not isinstance(value, dict):
             raise ValidationError(
                 f"{self.field_name}必须是字典",
                 self.field_name
@@ -251,69 +408,136 @@ class DictField(FieldValidator):
 class Schema:
     """模式基类 - 替代marshmallow.Schema"""
 
+    # 为False时输入中未定义的字段作为错误返回，对应marshmallow的unknown=RAISE
+    allow_unknown = True
+
     def __init__(self):
         self._fields = {}
+        self._compiled_load = None
+        self._dump_plan = None
         self._setup_fields()
+        self._compiled_load = self._compile_load()
 
     def _setup_fields(self):
         """设置字段 - 子类实现"""
         pass
 
     def add_field(self, name: str, field: FieldValidator):
-        """添加字段"""
+        """
+        添加字段
+        字段名驻留后作为结果字典的键；输入数据的键若来自固定来源（如JSON解析的object_hook）
+        也可用sys.intern驻留，查找时可直接按对象身份命中
+        """
+        name = sys.intern(name)
         field.field_name = name
         self._fields[name] = field
+        # 字段变化后在下次load/dump时重新生成加载函数和序列化计划
+        self._compiled_load = None
+        self._dump_plan = None
 
     def load(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """验证并加载数据"""
-        if not isinstance(data, dict):
+        if type(data) is not dict and not isinstance(data, dict):
             raise ValidationErrors({"_schema": ["输入必须是字典"]})
 
-        errors = {}
-        result = {}
-
-        # 处理每个字段
-        for field_name, field in self._fields.items():
-            try:
-                # 获取值，应用默认值
-                if field_name in data:
-                    value = data[field_name]
+        if self._compiled_load is None:
+            self._compiled_load = self._compile_load()
+
+        return self.post_load(self._compiled_load(data))
+
+    def _compile_load(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """
+        按当前字段生成专用的加载函数，省去逐字段循环和属性查找
+        字段的默认值、必填和可空设置在生成时固定，之后修改字段属性需重新调用add_field
+        """
+        namespace = {'ValidationError': ValidationError, 'ValidationErrors': ValidationErrors}
+        lines = ['def _compiled_load(data):',
+                 '    errors = {}',
+                 '    result = {}',
+                 '    get = data.get']
+
+        for i, (field_name, field) in enumerate(self._fields.items()):
+            key = repr(field_name)
+            namespace[f'_field_{i}'] = field
+            field_type = type(field)
+
+            # 获取值，应用默认值；覆盖了apply_default的字段仍调用原方法
+            if field_type.apply_default is FieldValidator.apply_default:
+                namespace[f'_default_{i}'] = field.default
+                lines.append(f'    value = get({key}, _default_{i})')
+            else:
+                lines.append(f'    value = data[{key}] if {key} in data else _field_{i}.apply_default(data)')
+
+            # 验证字段；可走快速路径的字段按 (值, 错误信息) 收集结果，并直接内联None值的处理，
+            # 覆盖了validate或_validate_value的字段调用validate
+            if field_type._fast_path:
+                namespace[f'_check_{i}'] = field._value_or_error
+                lines.append('    if value is None:')
+                none_error = field._none_error()
+                if none_error is None:
+                    lines.append(f'        result[{key}] = None')
                 else:
-                    value = field.apply_default(data)
-
-                # 验证字段
-                validated_value = field.validate(value)
-                result[field_name] = validated_value
-
-            except ValidationError as e:
-                errors[field_name] = [e.message]
-            except Exception as e:
-                errors[field_name] = [f"验证错误: {str(e)}"]
-
-        if errors:
-            raise ValidationErrors(errors)
-
-        return result
+                    lines.append(f'        errors[{key}] = [{none_error!r}]')
+                lines.append('    else:')
+                lines.append(f'        value, error = _check_{i}(value)')
+                lines.append('        if error is None:')
+                lines.append(f'            result[{key}] = value')
+                lines.append('        else:')
+                lines.append(f'            errors[{key}] = [error]')
+            else:
+                lines.append('    try:')
+                lines.append(f'        result[{key}] = _field_{i}.validate(value)')
+                lines.append('    except ValidationError as e:')
+                lines.append(f'        errors[{key}] = [e.message]')
+                lines.append('    except Exception as e:')
+                lines.append(f'        errors[{key}] = [f"验证错误: {{str(e)}}"]')
+
+        if not self.allow_unknown:
+            namespace['_known_fields'] = frozenset(self._fields)
+            lines.append('    for name in data.keys() - _known_fields:')
+            lines.append("        errors[name] = ['未知字段']")
+
+        lines.append('    if errors:')
+        lines.append('        raise ValidationErrors(errors)')
+        lines.append('    return result')
+
+        exec('\n'.join(lines), namespace)
+        return namespace['_compiled_load']
+
+    def post_load(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """验证通过后对结果做整体处理 - 子类按需覆盖，对应marshmallow的@post_load"""
+        return data
 
     def dump(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """序列化数据"""
-        if not isinstance(data, dict):
+        if type(data) is not dict and not isinstance(data, dict):
             return {}
 
+        if self._dump_plan is None:
+            self._dump_plan = self._build_dump_plan()
+
         result = {}
-        for field_name, field in self._fields.items():
-            value = data.get(field_name)
+        get = data.get
+        for field_name, datetime_format, default in self._dump_plan:
+            value = get(field_name)
             if value is not None:
                 # 特殊处理datetime
-                if isinstance(field, DateTimeField) and isinstance(value, datetime):
-                    result[field_name] = value.strftime(field.format)
+                if datetime_format is not None and isinstance(value, datetime):
+                    result[field_name] = value.strftime(datetime_format)
                 else:
                     result[field_name] = value
-            elif field.default is not None:
-                result[field_name] = field.default
+            elif default is not None:
+                result[field_name] = default
 
         return result
 
+    def _build_dump_plan(self) -> tuple:
+        """预先取出每个字段的 (字段名, datetime格式或None, 默认值)，dump时不再检查字段类型"""
+        return tuple(
+            (field_name, field.format if isinstance(field, DateTimeField) else None, field.default)
+            for field_name, field in self._fields.items()
+        )
+
 
 def validate_length(min_length: int = None, max_length: int = None):
     """长度验证器工厂函数"""
@@ -403,10 +627,11 @@ def validate_float(value: Any, field_name: str = "字段",
             raise ValidationError(f"{field_name}是必填的", field_name)
         return None
 
-    try:
-        value = float(value)
-    except (ValueError, TypeError):
-        raise ValidationError(f"{field_name}必须是数字", field_name)
+    if type(value) is not float:
+        try:
+            value = float(value)
+        except (ValueError, TypeError):
+            raise ValidationError(f"{field_name}必须是数字", field_name)
 
     if min_value is not None and value < min_value:
         raise ValidationError(f"{field_name}不能小于{min_value}", field_name)
@@ -417,7 +642,7 @@ def validate_float(value: Any, field_name: str = "字段",
 
 
 def validate_datetime(value: Any, field_name: str = "字段",
-                     format: str = '%Y-%m-%d %H:%M:%S',
+                     format: str = DATETIME_FORMAT,
                      required: bool = False) -> Optional[datetime]:
     """便捷的日期时间验证"""
     if value is None:
@@ -431,6 +656,11 @@ def validate_datetime(value: Any, field_name: str = "字段",
     if not isinstance(value, str):
         raise ValidationError(f"{field_name}必须是字符串或datetime对象", field_name)
 
+    if format == DATETIME_FORMAT:
+        parsed = _parse_fixed_datetime(value)
+        if parsed is not None:
+            return parsed
+
     try:
         return datetime.strptime(value, format)
     except ValueError:
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轻量xlsx写出模块
+直接按行拼接工作表XML并写入zip，不创建任何单元格对象，用于只含数值和文本的大批量导出
+"""
+
+import io
+import math
+import re
+import zipfile
+from decimal import Decimal
+from typing import Any, Iterable, List, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+# 单元格样式编号，对应 _STYLES_XML 中 cellXfs 的顺序
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1  # 白色粗体、蓝色底、细边框、居中，与openpyxl导出的标题行一致
+STYLE_BOLD = 2
+
+# XML 1.0 不允许出现的控制字符
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# 每写出这么多行向zip刷新一次
+_ROWS_PER_WRITE = 1000
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+_ROOT_RELS_XML = (
+    _XML_HEADER +
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_STYLES_XML = (
+    _XML_HEADER +
+    f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="3">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF366092"/><bgColor rgb="FF366092"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="1" xfId="0" applyFont="1" applyFill="1" '
+    'applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _column_letter(index: int) -> str:
+    """列序号(从0开始)转换为Excel列字母"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref: str, value: Any, style: int) -> str:
+    """生成单个单元格的XML，None返回空字符串"""
+    if value is None:
+        return ''
+    style_attr = f' s="{style}"' if style else ''
+    # bool 按文本写出；NaN、Infinity 不是合法的数值单元格，同样按文本写出
+    value_type = type(value)
+    if (value_type is int or (value_type is float and math.isfinite(value))
+            or (value_type is Decimal and value.is_finite())):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class FastXlsxWorkbook:
+    """逐个工作表写出的xlsx工作簿
+
+    工作表按 write_sheet 的调用顺序依次写入zip，写完后不可修改；
+    close() 时写入工作簿结构、样式等其余部件。
+    """
+
+    def __init__(self, file):
+        self._zip = zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED)
+        self._sheet_names: List[str] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_sheet(self, name: str, rows: Iterable[Sequence[Any]], header: Sequence[Any] = None,
+                    column_widths: Sequence[float] = (), first_column_style: int = STYLE_DEFAULT) -> int:
+        """
+        写出一个工作表，rows只遍历一次，返回写出的数据行数（不含标题行）
+        header使用标题样式；first_column_style应用于每个数据行的第一列
+        """
+        self._sheet_names.append(name)
+        part = f'xl/worksheets/sheet{len(self._sheet_names)}.xml'
+
+        raw = self._zip.open(part, 'w', force_zip64=True)
+        with io.TextIOWrapper(raw, encoding='utf-8') as sheet:
+            sheet.write(f'{_XML_HEADER}<worksheet xmlns="{_MAIN_NS}">')
+            if column_widths:
+                sheet.write('<cols>')
+                for col_num, width in enumerate(column_widths, 1):
+                    sheet.write(f'<col min="{col_num}" max="{col_num}" width="{width}" customWidth="1"/>')
+                sheet.write('</cols>')
+            sheet.write('<sheetData>')
+
+            # 列字母按需扩展，每行只做字符串拼接
+            letters: List[str] = []
+            row_num = 0
+            if header is not None:
+                row_num = 1
+                sheet.write(self._row_xml(row_num, header, letters, STYLE_HEADER, STYLE_HEADER))
+
+            row_count = 0
+            chunk = []
+            for row_count, row in enumerate(rows, 1):
+                chunk.append(self._row_xml(row_num + row_count, row, letters,
+                                           first_column_style, STYLE_DEFAULT))
+                if len(chunk) >= _ROWS_PER_WRITE:
+                    sheet.write(''.join(chunk))
+                    chunk.clear()
+            sheet.write(''.join(chunk))
+
+            sheet.write('</sheetData></worksheet>')
+
+        return row_count
+
+    @staticmethod
+    def _row_xml(row_num: int, values: Sequence[Any], letters: List[str],
+                 first_style: int, style: int) -> str:
+        while len(letters) < len(values):
+            letters.append(_column_letter(len(letters)))
+        suffix = str(row_num)
+        cells = ''.join(
+            _cell_xml(letters[col] + suffix, value, first_style if col == 0 else style)
+            for col, value in enumerate(values)
+        )
+        return f'<row r="{row_num}">{cells}</row>'
+
+    def close(self):
+        """写入工作簿结构、关系和样式，完成zip文件"""
+        if self._zip is None:
+            return
+
+        count = len(self._sheet_names)
+        sheets = ''.join(
+            f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self._sheet_names, 1)
+        )
+        workbook_rels = ''.join(
+            f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, count + 1)
+        )
+        sheet_types = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, count + 1)
+        )
+
+        self._zip.writestr('[Content_Types].xml', (
+            _XML_HEADER +
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{sheet_types}</Types>'
+        ))
+        self._zip.writestr('_rels/.rels', _ROOT_RELS_XML)
+        self._zip.writestr('xl/workbook.xml', (
+            f'{_XML_HEADER}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+        self._zip.writestr('xl/_rels/workbook.xml.rels', (
+            _XML_HEADER +
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{workbook_rels}'
+            f'<Relationship Id="rId{count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        self._zip.writestr('xl/styles.xml', _STYLES_XML)
+
+        self._zip.close()
+        self._zip = None
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用各模块共用的常量 - 不依赖数据库驱动等第三方库，可被任意模块导入
+"""
+
+# 时间字段统一的字符串格式
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 批量插入每批发送的行数，避免单条语句超过max_allowed_packet
+INSERT_BATCH_SIZE = 1000
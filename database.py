@@ -4,24 +4,114 @@
 完整修复版本的数据库连接管理器 - 修复execute_query方法并保留所有原有功能
 """
 
-import pymysql
-from pymysql import Error, MySQLError
-from pymysql.cursors import DictCursor
+# 优先使用mysqlclient（libmysqlclient的C扩展），协议解析和结果行构建不经过Python代码；
+# 未安装时回退到纯Python实现的PyMySQL，两者的连接和游标接口在本模块的用法上一致
+try:
+    import MySQLdb as pymysql
+    from MySQLdb import Error, MySQLError
+    from MySQLdb.cursors import Cursor, DictCursor, SSDictCursor
+except ImportError:
+    import pymysql
+    from pymysql import Error, MySQLError
+    from pymysql.cursors import Cursor, DictCursor, SSDictCursor
 from datetime import datetime
 import logging
+import os
+import re
+import tempfile
+import threading
 import time
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Iterator, Optional
 from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import QueuePool
+
+from constants import DATETIME_FORMAT, INSERT_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
- 
+
+# 仅当数据库位于本机时才使用Unix socket连接
+_LOCAL_HOSTS = ('localhost', '127.0.0.1')
+
+# 拼接进SQL的表名、列名只允许普通标识符
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _check_identifier(name: str) -> str:
+    """校验表名或列名，不合法时抛出ValueError"""
+    if not isinstance(name, str) or not _IDENTIFIER_RE.match(name):
+        raise ValueError(f"非法的标识符: {name!r}")
+    return name
+
+
+def _to_tsv_field(value: Any) -> str:
+    """将单个值转换为LOAD DATA默认转义规则下的TSV字段"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        value = int(value)
+    elif isinstance(value, datetime):
+        value = value.strftime(DATETIME_FORMAT)
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _identity(value):
+    return value
+
+
+# 表示连接已断开的错误码：2006 server has gone away、2013 查询中连接丢失等；
+# 0 为驱动在连接已关闭时抛出的InterfaceError
+_DISCONNECT_ERRORS = frozenset((0, 2006, 2013, 2014, 2045, 2055))
+
+
+def _is_disconnect(e: Exception) -> bool:
+    """判断异常是否说明连接已不可用"""
+    code = e.args[0] if e.args else None
+    return code in _DISCONNECT_ERRORS or 'Packet sequence number wrong' in str(e)
+
+
+def _rollback_quietly(connection):
+    """回滚连接上可能未结束的事务，连接已不可用时忽略错误"""
+    try:
+        connection.rollback()
+    except Exception:
+        pass
+
+
+# 连接空闲超过该秒数才在借出时ping；刚归还的连接直接使用，偶发的断线由execute_query的重试处理
+_PING_IDLE_SECONDS = 30
+
+
+def _mark_last_used(dbapi_connection, connection_record):
+    """连接创建或归还时记录时间，供借出时判断空闲时长"""
+    connection_record.info['last_used'] = time.monotonic()
+
+
+def _ping_on_checkout(dbapi_connection, connection_record, connection_proxy):
+    """连接空闲较久时在借出前检查是否可用，失败时由连接池换用新连接"""
+    if time.monotonic() - connection_record.info.get('last_used', 0) < _PING_IDLE_SECONDS:
+        return
+    try:
+        dbapi_connection.ping(False)
+    except Exception:
+        raise DisconnectionError()
+
+
+# 需要预先转换的参数类型，按type()精确匹配；未列出的类型由驱动自行转义
+_PARAM_CONVERTERS = {
+    datetime: lambda value: value.strftime(DATETIME_FORMAT),
+}
+
 
 class DatabaseConnection:
-    """数据库连接类 - 基于pymysql"""
+    """数据库连接类 - 基于MySQLdb/pymysql"""
 
     def __init__(self, host: str, port: int, database: str,
                  user: str, password: str, charset: str = 'utf8mb4',
-                 autocommit: bool = True):
+                 autocommit: bool = True, unix_socket: Optional[str] = None):
         self.host = host
         self.port = port
         self.database = database
@@ -29,11 +119,13 @@ class DatabaseConnection:
         self.password = password
         self.charset = charset
         self.autocommit = autocommit
+        self.unix_socket = unix_socket if host in _LOCAL_HOSTS else None
         self.connection = None
 
     def connect(self) -> bool:
         """建立数据库连接"""
         try:
+            kwargs = {'unix_socket': self.unix_socket} if self.unix_socket else {}
             self.connection = pymysql.connect(
                 host=self.host,
                 port=self.port,
@@ -45,7 +137,8 @@ class DatabaseConnection:
                 cursorclass=DictCursor,
                 connect_timeout=30,
                 read_timeout=30,
-                write_timeout=30
+                write_timeout=30,
+                **kwargs
             )
             logger.info(f"数据库连接成功: {self.host}:{self.port}/{self.database}")
             return True
@@ -58,7 +151,7 @@ class DatabaseConnection:
         if not self.connection:
             return False
         try:
-            self.connection.ping(reconnect=False)
+            self.connection.ping(False)
             return True
         except:
             return False
@@ -72,19 +165,57 @@ class DatabaseConnection:
 
 
 class UnifiedDatabaseManager:
-    """统一数据库管理器 - 修复版本"""
+    """统一数据库管理器 - 基于连接池
+
+    每次查询从连接池借出连接，用完归还；事务期间当前线程固定使用同一连接。
+    连接池参数与 Config.SQLALCHEMY_ENGINE_OPTIONS 的键名保持一致。
+    """
 
     def __init__(self, db_config: Dict[str, Any]):
         self.db_config = db_config
-        self.connection = DatabaseConnection(
-            host=db_config.get('host', 'localhost'),
+        self.autocommit = db_config.get('autocommit', True)
+
+        host = db_config.get('host', 'localhost')
+        unix_socket = db_config.get('unix_socket')
+        # 连接参数只构建一次，连接池创建新连接时直接复用
+        self._connect_kwargs = dict(
+            host=host,
             port=db_config.get('port', 3306),
             database=db_config.get('database', 'test'),
             user=db_config.get('user', 'root'),
             password=db_config.get('password', ''),
             charset=db_config.get('charset', 'utf8mb4'),
-            autocommit=db_config.get('autocommit', True)
+            autocommit=self.autocommit,
+            cursorclass=DictCursor,
+            connect_timeout=30,
+            read_timeout=30,
+            write_timeout=30
         )
+        # mysqlclient不接受unix_socket=None，仅在使用socket时传入
+        if unix_socket and host in _LOCAL_HOSTS:
+            self._connect_kwargs['unix_socket'] = unix_socket
+
+        # autocommit连接归还时没有未结束的事务，不再逐次发送ROLLBACK；
+        # 事务连接由end_transaction显式提交或回滚，出错时由_checkout/begin_transaction回滚
+        reset_on_return = None if self.autocommit else db_config.get('pool_reset_on_return', 'rollback')
+        self._pool = QueuePool(
+            self._create_connection,
+            pool_size=db_config.get('pool_size', 10),
+            max_overflow=db_config.get('max_overflow', 10),
+            recycle=db_config.get('pool_recycle', 1800),
+            timeout=db_config.get('pool_timeout', 30),
+            reset_on_return=reset_on_return
+        )
+        if db_config.get('pool_pre_ping', True):
+            event.listen(self._pool, 'connect', _mark_last_used)
+            event.listen(self._pool, 'checkin', _mark_last_used)
+            event.listen(self._pool, 'checkout', _ping_on_checkout)
+
+        # 事务中的连接按线程固定，期间的查询都在该连接上执行
+        self._local = threading.local()
+
+        # fork前继承的连接池，见reset_after_fork
+        self._inherited_pools = []
 
         # 统计信息
         self.stats = {
@@ -94,74 +225,180 @@ class UnifiedDatabaseManager:
             'connection_attempts': 0,
             'reconnections': 0
         }
+        self._stats_lock = threading.Lock()
+
+    def _create_connection(self):
+        """连接池创建新连接的工厂函数"""
+        self._count('connection_attempts')
+        connection = pymysql.connect(**self._connect_kwargs)
+        logger.info(f"数据库连接成功: {self.db_config.get('host')}:{self.db_config.get('port')}/{self.db_config.get('database')}")
+        return connection
+
+    def _count(self, key: str):
+        """统计计数，多个请求线程共用同一个管理器"""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    @contextmanager
+    def _checkout(self):
+        """借出连接，退出时归还；当前线程处于事务中时直接使用事务连接"""
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            yield pinned
+            return
+
+        connection = self._pool.connect()
+        try:
+            yield connection
+        except (Error, MySQLError) as e:
+            # 连接已断开时丢弃，不再放回连接池；否则回滚可能未结束的事务后再归还
+            if _is_disconnect(e):
+                connection.invalidate(e)
+            else:
+                _rollback_quietly(connection)
+            raise
+        finally:
+            connection.close()
+
+    def begin_transaction(self, read_only: bool = False) -> bool:
+        """为当前线程借出一个连接并开启事务；已在事务中时返回False，由外层事务负责提交"""
+        if getattr(self._local, 'connection', None) is not None:
+            return False
+        connection = self._pool.connect()
+        try:
+            if read_only:
+                with connection.cursor() as cursor:
+                    cursor.execute("START TRANSACTION READ ONLY")
+            else:
+                connection.begin()
+        except Exception:
+            _rollback_quietly(connection)
+            connection.close()
+            raise
+        self._local.connection = connection
+        logger.debug("事务开始")
+        return True
+
+    def end_transaction(self, commit: bool = True):
+        """提交或回滚当前线程的事务，并归还连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            return
+        self._local.connection = None
+        try:
+            if commit:
+                connection.commit()
+                logger.debug("事务提交")
+            else:
+                connection.rollback()
+                logger.debug("事务回滚")
+        except Exception:
+            # 提交失败时事务仍未结束，连接池不再自动回滚，归还前需显式回滚
+            _rollback_quietly(connection)
+            raise
+        finally:
+            connection.close()
+
+    @contextmanager
+    def read_only_transaction(self):
+        """
+        开启只读事务，期间当前线程的execute_*查询都在同一连接上执行，共享一致性快照
+        InnoDB对只读事务不分配事务ID，退出时统一提交一次；已在事务中时直接加入外层事务
+        """
+        started = self.begin_transaction(read_only=True)
+        try:
+            yield
+        except BaseException:
+            if started:
+                self.end_transaction(commit=False)
+            raise
+        if started:
+            self.end_transaction(commit=True)
 
     def connect(self) -> bool:
-        """建立数据库连接"""
-        self.stats['connection_attempts'] += 1
-        return self.connection.connect()
+        """确认可以建立数据库连接 - 连接由连接池按需创建，保留此方法以兼容旧调用"""
+        try:
+            with self._checkout():
+                pass
+            return True
+        except (Error, MySQLError) as e:
+            logger.error(f"数据库连接失败: {e}")
+            return False
 
     def disconnect(self):
-        """关闭数据库连接"""
-        self.connection.disconnect()
+        """关闭连接池中的所有空闲连接"""
+        self._pool.dispose()
+        logger.info("数据库连接池已关闭")
 
     def reconnect(self) -> bool:
         """重新连接数据库"""
-        self.stats['reconnections'] += 1
+        self._count('reconnections')
         logger.info("重新连接数据库...")
         self.disconnect()
         return self.connect()
 
+    def reset_after_fork(self):
+        """
+        fork后的子进程换用新的连接池
+        继承自父进程的连接与父进程共用同一个socket，既不关闭也不释放：mysqlclient释放连接对象时会调用
+        mysql_close向服务器发送COM_QUIT，断开父进程正在使用的连接，因此保留旧连接池的引用直到进程退出
+        """
+        self._inherited_pools.append(self._pool)
+        self._pool = self._pool.recreate()
+        self._local = threading.local()
+
     def is_connected(self) -> bool:
-        """检查连接状态"""
-        return self.connection.is_connected()
+        """检查连接状态 - 仅供健康检查使用，查询路径依赖连接池借出时的ping"""
+        try:
+            with self._checkout() as connection:
+                connection.ping(False)
+            return True
+        except Exception:
+            return False
+
+    def _in_transaction(self) -> bool:
+        return getattr(self._local, 'connection', None) is not None
+
+    @staticmethod
+    def _process_params(params: Optional[tuple]) -> Optional[tuple]:
+        """datetime格式化为秒级字符串，其余参数原样交给驱动按类型转义"""
+        if not params:
+            return params
+        convert = _PARAM_CONVERTERS.get
+        return tuple(convert(type(param), _identity)(param) for param in params)
 
     def execute_query(self, sql: str, params: tuple = None) -> Dict[str, Any]:
         """
         执行SQL查询 - 增强版本
-        返回包含结果和影响行数的字典
+        返回包含结果和影响行数的字典；连接断开时换用新连接重试
         """
+        # 确保参数类型正确
+        params = self._process_params(params)
+
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                if not self.is_connected():
-                    if not self.connect():
-                        raise Exception("无法建立数据库连接")
-
-                self.stats['total_queries'] += 1
-
-                # 确保参数类型正确
-                if params:
-                    # 将所有参数转换为字符串，避免类型问题
-                    processed_params = []
-                    for param in params:
-                        if isinstance(param, datetime):
-                            processed_params.append(param.strftime('%Y-%m-%d %H:%M:%S'))
-                        else:
-                            processed_params.append(str(param) if param is not None else None)
-                    params = tuple(processed_params)
-
-                with self.connection.connection.cursor() as cursor:
+                self._count('total_queries')
+
+                with self._checkout() as connection, connection.cursor() as cursor:
                     cursor.execute(sql, params)
 
-                # 获取影响行数
-                affected_rows = cursor.rowcount
-
-                # 判断查询类型并获取相应结果
-                sql_upper = sql.strip().upper()
-                if sql_upper.startswith('SELECT'):
-                    results = cursor.fetchall()
-                elif sql_upper.startswith(('INSERT', 'UPDATE', 'DELETE')):
-                    # 对于INSERT/UPDATE/DELETE，返回影响行数
-                    results = []
-                    logger.info(f"SQL执行成功，影响行数: {affected_rows}")
-                else:
-                    results = []
-
-                # 提交事务（如果autocommit为False）
-                if not self.connection.autocommit:
-                    self.connection.connection.commit()
-
-                self.stats['successful_queries'] += 1
+                    # 获取影响行数
+                    affected_rows = cursor.rowcount
+
+                    # 由驱动返回的列描述判断是否有结果集，SELECT/SHOW/DESCRIBE及括号、注释开头的语句都能正确识别
+                    if cursor.description:
+                        results = cursor.fetchall()
+                    else:
+                        # 对于INSERT/UPDATE/DELETE等语句，返回影响行数
+                        results = []
+                        logger.info(f"SQL执行成功，影响行数: {affected_rows}")
+
+                    # 提交事务（如果autocommit为False且不在TransactionManager管理的事务中）
+                    if not self.autocommit and not self._in_transaction():
+                        connection.commit()
+
+                self._count('successful_queries')
                 logger.debug(f"查询执行成功: {len(results)}条结果")
 
                 return {
@@ -171,69 +408,126 @@ class UnifiedDatabaseManager:
                 }
 
             except (Error, MySQLError) as e:
-                if attempt < max_retries - 1:
+                # 只有连接断开时才重试，断开的连接已被连接池丢弃；事务中的语句不能换连接重试
+                if attempt < max_retries - 1 and _is_disconnect(e) and not self._in_transaction():
                     logger.warning(f"SQL执行失败，正在重试 ({attempt + 1}/{max_retries}): {e}")
                     logger.warning(f"SQL语句: {sql}")
                     logger.warning(f"参数: {params}")
+                    time.sleep(0.5 * (attempt + 1))  # 递增延迟
+                    continue
 
-                    # 尝试重新连接
-                    try:
-                        self.disconnect()
-                        time.sleep(0.5 * (attempt + 1))  # 递增延迟
-                        continue
-                    except Exception as reconnect_error:
-                        logger.error(f"重连失败: {reconnect_error}")
-                        continue
-                else:
-                    # 最后一次重试失败
-                    self.stats['failed_queries'] += 1
-                    logger.error(f"SQL执行失败（已重试{max_retries}次）: {e}")
-                    logger.error(f"SQL语句: {sql}")
-                    logger.error(f"参数: {params}")
-
-                    # 检查是否是连接问题
-                    if "Packet sequence number wrong" in str(e) or "MySQL server has gone away" in str(e):
-                        try:
-                            self.disconnect()
-                            self.connect()
-                            logger.info("已尝试重新连接数据库")
-                        except Exception as reconnect_error:
-                            logger.error(f"重新连接失败: {reconnect_error}")
-
-                    return {
-                        'results': [],
-                        'affected_rows': 0,
-                        'success': False,
-                        'error': str(e)
-                    }
+                self._count('failed_queries')
+                logger.error(f"SQL执行失败: {e}")
+                logger.error(f"SQL语句: {sql}")
+                logger.error(f"参数: {params}")
+
+                return {
+                    'results': [],
+                    'affected_rows': 0,
+                    'success': False,
+                    'error': str(e)
+                }
+
+    def execute_query_stream(self, sql: str, params: tuple = None,
+                             fetch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        使用服务端游标执行SELECT，每次返回不超过fetch_size行
+        结果不在客户端整体缓存；生成器关闭前独占一个连接，调用方应连续迭代完毕
+        """
+        self._count('total_queries')
+        params = self._process_params(params)
+        with self._checkout() as connection:
+            cursor = connection.cursor(SSDictCursor)
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    yield rows
+                self._count('successful_queries')
+
+            except (Error, MySQLError) as e:
+                self._count('failed_queries')
+                logger.error(f"流式查询失败: {e}")
+                logger.error(f"SQL语句: {sql}")
+                logger.error(f"参数: {params}")
+                raise
+
+            finally:
+                # 提前关闭时会读完剩余结果，保证连接可继续使用
+                cursor.close()
+
+    def execute_query_columns(self, sql: str, params: tuple = None) -> Dict[str, Any]:
+        """
+        执行SELECT查询并按列返回结果
+        使用元组游标避免逐行构建字典，返回 {'columns': {列名: [值, ...]}} 形式的结果
+        """
+        self._count('total_queries')
+        params = self._process_params(params)
+        try:
+            with self._checkout() as connection, connection.cursor(Cursor) as cursor:
+                cursor.execute(sql, params)
+
+                names = [column[0] for column in cursor.description or ()]
+                rows = cursor.fetchall()
+                values = zip(*rows) if rows else ([] for _ in names)
+
+            self._count('successful_queries')
+            return {
+                'columns': {name: list(column) for name, column in zip(names, values)},
+                'row_count': len(rows),
+                'success': True
+            }
+
+        except (Error, MySQLError) as e:
+            self._count('failed_queries')
+            logger.error(f"SQL执行失败: {e}")
+            logger.error(f"SQL语句: {sql}")
+            logger.error(f"参数: {params}")
+            return {
+                'columns': {},
+                'row_count': 0,
+                'success': False,
+                'error': str(e)
+            }
+
+    def iter_query(self, sql: str, params: tuple = None,
+                   arraysize: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        逐行返回SELECT结果，内存占用与结果集大小无关
+        内部按arraysize行批量读取服务端游标，约束同 execute_query_stream
+        """
+        for rows in self.execute_query_stream(sql, params, arraysize):
+            yield from rows
 
     def execute_many(self, sql: str, params_list: List[tuple]) -> Dict[str, Any]:
         """批量执行SQL - 修复版本"""
-        if not self.is_connected():
-            if not self.connect():
-                raise Exception("无法建立数据库连接")
-
+        in_transaction = self._in_transaction()
         try:
-            self.stats['total_queries'] += 1
-            with self.connection.connection.cursor() as cursor:
-                affected_rows = cursor.executemany(sql, params_list)
+            self._count('total_queries')
+            with self._checkout() as connection, connection.cursor() as cursor:
+                try:
+                    affected_rows = cursor.executemany(sql, params_list)
 
-                if not self.connection.autocommit:
-                    self.connection.connection.commit()
+                    if not self.autocommit and not in_transaction:
+                        connection.commit()
+                except (Error, MySQLError):
+                    if not self.autocommit and not in_transaction:
+                        connection.rollback()
+                    raise
 
-                self.stats['successful_queries'] += 1
-                logger.info(f"批量执行成功: {len(params_list)}条记录，影响行数: {affected_rows}")
+            self._count('successful_queries')
+            logger.info(f"批量执行成功: {len(params_list)}条记录，影响行数: {affected_rows}")
 
-                return {
-                    'affected_rows': affected_rows,
-                    'success': True
-                }
+            return {
+                'affected_rows': affected_rows,
+                'success': True
+            }
 
         except (Error, MySQLError) as e:
-            self.stats['failed_queries'] += 1
+            self._count('failed_queries')
             logger.error(f"批量执行失败: {e}")
-            if not self.connection.autocommit:
-                self.connection.connection.rollback()
             return {
                 'affected_rows': 0,
                 'success': False,
@@ -241,7 +535,11 @@ class UnifiedDatabaseManager:
             }
 
     def execute_insert(self, table: str, data: List[Dict[str, Any]]) -> int:
-        """执行批量插入"""
+        """
+        执行批量插入
+        列以第一条数据的键为准，每条数据按列名取值；语句符合驱动的多行VALUES改写规则，
+        每批作为一条多行INSERT发送
+        """
         if not data:
             return 0
 
@@ -250,11 +548,75 @@ class UnifiedDatabaseManager:
         placeholders = ', '.join(['%s'] * len(columns))
         sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
 
-        # 准备参数
-        params_list = [tuple(item.values()) for item in data]
+        # 准备参数 - 按列名取值，避免各条数据键顺序不同导致错位
+        try:
+            params_list = [tuple(item[column] for column in columns) for item in data]
+        except KeyError as e:
+            raise ValueError(f"插入数据缺少字段: {e}")
+
+        # 分批发送，避免单条语句超过max_allowed_packet
+        affected_rows = 0
+        for start in range(0, len(params_list), INSERT_BATCH_SIZE):
+            result = self.execute_many(sql, params_list[start:start + INSERT_BATCH_SIZE])
+            if not result['success']:
+                break
+            affected_rows += result['affected_rows']
+        return affected_rows
+
+    def bulk_insert(self, table: str, columns: List[str], rows: List[tuple]) -> Dict[str, Any]:
+        """
+        批量插入数据 - 使用LOAD DATA LOCAL INFILE
+        数据先写成临时TSV文件，由服务器一次性解析；服务器未开启local_infile时回退到execute_many。
+        允许服务器读取本地文件的local_infile只在这次导入单独建立的连接上开启，连接池中的连接不开启
+        """
+        if not rows:
+            return {'affected_rows': 0, 'success': True}
+
+        _check_identifier(table)
+        for column in columns:
+            _check_identifier(column)
+
+        # 驱动只能按文件路径读取本地文件，因此使用临时文件而非内存缓冲区
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='',
+                                         suffix='.tsv', delete=False) as tsv_file:
+            for row in rows:
+                tsv_file.write('\t'.join(map(_to_tsv_field, row)))
+                tsv_file.write('\n')
+            tsv_path = tsv_file.name
+
+        sql = (f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+               "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+               f"({', '.join(columns)})")
 
-        result = self.execute_many(sql, params_list)
-        return result['affected_rows']
+        try:
+            self._count('total_queries')
+            connection = pymysql.connect(**self._connect_kwargs, local_infile=True)
+            try:
+                with connection.cursor() as cursor:
+                    affected_rows = cursor.execute(sql, (tsv_path,))
+
+                if not self.autocommit:
+                    connection.commit()
+            finally:
+                connection.close()
+
+            self._count('successful_queries')
+            logger.info(f"批量导入成功: {len(rows)}条记录，影响行数: {affected_rows}")
+
+            return {
+                'affected_rows': affected_rows,
+                'success': True
+            }
+
+        except (Error, MySQLError) as e:
+            self._count('failed_queries')
+            logger.warning(f"LOAD DATA导入失败，回退到executemany: {e}")
+            placeholders = ', '.join(['%s'] * len(columns))
+            insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+            return self.execute_many(insert_sql, rows)
+
+        finally:
+            os.remove(tsv_path)
 
     def get_connection_info(self) -> Dict[str, Any]:
         """获取连接信息"""
@@ -264,6 +626,7 @@ class UnifiedDatabaseManager:
             'database': self.db_config.get('database'),
             'user': self.db_config.get('user'),
             'is_connected': self.is_connected(),
+            'pool': self._pool.status(),
             'stats': self.stats
         }
 
@@ -278,11 +641,17 @@ class QueryBuilder:
         if not data:
             raise ValueError("更新数据不能为空")
 
-        set_clauses = []
-        for column in data.keys():
-            set_clauses.append(f"{column} = %s")
+        # 列顺序需与调用方按 data.values() 组装的参数顺序一致，因此不排序
+        return QueryBuilder._build_update_cached(table, tuple(data), where_clause)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _build_update_cached(table: str, columns: tuple,
+                             where_clause: str = None) -> str:
+        """按表名、列名和WHERE条件缓存UPDATE模板，参数仍通过%s绑定"""
+        set_clauses = ', '.join(f"{column} = %s" for column in columns)
 
-        sql = f"UPDATE {table} SET {', '.join(set_clauses)}"
+        sql = f"UPDATE {table} SET {set_clauses}"
 
         if where_clause:
             sql += f" WHERE {where_clause}"
@@ -325,53 +694,37 @@ class QueryBuilder:
 
 
 class TransactionManager:
-    """事务管理器"""
+    """事务管理器 - 事务期间当前线程的查询都在同一个连接上执行"""
 
     def __init__(self, db_manager: UnifiedDatabaseManager):
         self.db_manager = db_manager
         self.transaction_active = False
 
     def __enter__(self):
-        if not self.db_manager.is_connected():
-            if not self.db_manager.connect():
-                raise Exception("无法建立数据库连接")
-
-        # 开始事务
-        self.db_manager.connection.connection.autocommit = False
-        self.transaction_active = True
-        logger.debug("事务开始")
+        # 已处于外层事务中时直接加入，由外层负责提交或回滚
+        self.transaction_active = self.db_manager.begin_transaction()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.transaction_active:
-            if exc_type is None:
-                # 提交事务
-                self.db_manager.connection.connection.commit()
-                logger.debug("事务提交")
-            else:
-                # 回滚事务
-                self.db_manager.connection.connection.rollback()
+            if exc_type is not None:
                 logger.error(f"事务回滚: {exc_val}")
-
-            # 恢复自动提交
-            self.db_manager.connection.connection.autocommit = True
+            self.db_manager.end_transaction(commit=exc_type is None)
             self.transaction_active = False
 
     def commit(self):
         """手动提交事务"""
         if self.transaction_active:
-            self.db_manager.connection.connection.commit()
+            self.db_manager.end_transaction(commit=True)
             logger.debug("事务手动提交")
             self.transaction_active = False
-            self.db_manager.connection.connection.autocommit = True
 
     def rollback(self):
         """手动回滚事务"""
         if self.transaction_active:
-            self.db_manager.connection.connection.rollback()
+            self.db_manager.end_transaction(commit=False)
             logger.debug("事务手动回滚")
             self.transaction_active = False
-            self.db_manager.connection.connection.autocommit = True
 
 
 # 数据库工厂函数
@@ -382,7 +735,7 @@ def create_database_manager(config_name: str = 'default') -> UnifiedDatabaseMana
     # 获取配置类
     config_class = config[config_name]
 
-    # 转换为pymysql需要的配置格式
+    # 转换为数据库驱动需要的配置格式
     db_config = {
         'host': getattr(config_class, 'DB_HOST', 'localhost'),
         'port': getattr(config_class, 'DB_PORT', 3306),
@@ -390,7 +743,10 @@ def create_database_manager(config_name: str = 'default') -> UnifiedDatabaseMana
         'user': getattr(config_class, 'DB_USER', 'root'),
         'password': getattr(config_class, 'DB_PASSWORD', ''),
         'charset': 'utf8mb4',
-        'autocommit': True
+        'autocommit': True,
+        'unix_socket': getattr(config_class, 'DB_SOCKET', None),
+        # 连接池参数
+        **getattr(config_class, 'SQLALCHEMY_ENGINE_OPTIONS', {})
     }
 
     return UnifiedDatabaseManager(db_config)
@@ -408,8 +764,22 @@ def get_db_manager() -> UnifiedDatabaseManager:
     return default_db_manager
 
 
-def init_database(app=None):
-    """初始化数据库（可选Flask应用集成）"""
+def _drop_inherited_connection():
+    """fork后的子进程不再使用从父进程继承的连接，首次查询时重新建立"""
+    if default_db_manager is not None:
+        default_db_manager.reset_after_fork()
+
+
+# gunicorn --preload 会在主进程中初始化数据库，工作进程不能共用同一个socket
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_drop_inherited_connection)
+
+
+def init_database(app=None, connect: bool = True):
+    """初始化数据库（可选Flask应用集成）
+
+    connect为False时只完成注册，由调用方自行建立连接
+    """
     if app:
         # Flask应用集成
         app.config['DATABASE_MANAGER'] = get_db_manager()
@@ -425,6 +795,9 @@ def init_database(app=None):
             # 在请求结束时清理资源
             pass
 
+    if not connect:
+        return
+
     # 确保数据库连接可用
     db_manager = get_db_manager()
     if not db_manager.connect():
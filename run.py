@@ -4,10 +4,15 @@
 异常数据管理API启动文件
 """
 
+import os
+
 from app import create_app
 
 # 创建应用实例
 app = create_app('development')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5009, debug=True) 
\ No newline at end of file
+    # 调试器和自动重载需显式开启（FLASK_DEBUG=1），重载会让所有模块导入两次
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    # 多线程处理请求，并发请求各自从连接池借用连接
+    app.run(host='0.0.0.0', port=5009, debug=debug, threaded=True, use_reloader=debug) 
\ No newline at end of file
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异常数据查询条件构建测试
+"""
+
+import unittest
+from datetime import datetime
+
+from app.models import ExceptionData, _REGION_SQL_COLUMNS, _build_filtered_select, _like_prefix
+
+
+class FilteredSelectTest(unittest.TestCase):
+    """_build_filtered_select 行政区划前缀条件"""
+
+    def test_adcd_uses_prefix_like(self):
+        sql, params = _build_filtered_select(adcd='6611')
+        self.assertIn('aid LIKE %s', sql)
+        self.assertEqual(params, ['6611%'])
+
+    def test_adcd_ending_with_9(self):
+        # 末位为9的编码曾被改写为 aid < '66110:'，在utf8mb4_unicode_ci下得到空范围
+        sql, params = _build_filtered_select(adcd='661109')
+        self.assertIn('aid LIKE %s', sql)
+        self.assertNotIn('aid <', sql)
+        self.assertEqual(params, ['661109%'])
+
+    def test_adcd_combined_with_other_filters(self):
+        sql, params = _build_filtered_select(adcd='661109', stcd='S001', status=0)
+        self.assertIn('aid LIKE %s AND stcd = %s AND rem IS NULL', sql)
+        self.assertEqual(params, ['661109%', 'S001'])
+
+
+class LikePrefixTest(unittest.TestCase):
+    """_like_prefix 通配符转义"""
+
+    def test_plain_prefix(self):
+        self.assertEqual(_like_prefix('661101'), '661101%')
+
+    def test_wildcards_are_escaped(self):
+        self.assertEqual(_like_prefix('66%1_'), '66\\%1\\_%')
+
+    def test_backslash_is_escaped(self):
+        self.assertEqual(_like_prefix('66\\'), '66\\\\%')
+
+    def test_max_code_point(self):
+        self.assertEqual(_like_prefix('66\U0010ffff'), '66\U0010ffff%')
+
+
+class RegionColumnsTest(unittest.TestCase):
+    """市县信息CASE表达式"""
+
+    def test_aid_compared_as_integer(self):
+        xian = _REGION_SQL_COLUMNS[1]
+        self.assertIn('CASE CAST(aid AS SIGNED)', xian)
+        self.assertIn("WHEN 661109 THEN '第九团'", xian)
+        self.assertNotIn("aid = '", xian)
+
+    def test_null_and_fallback(self):
+        xian = _REGION_SQL_COLUMNS[1]
+        self.assertTrue(xian.startswith("CASE WHEN aid IS NULL THEN ''"))
+        self.assertTrue(xian.endswith("ELSE CONCAT('第', aid, '团') END END AS xian"))
+
+
+class _RecordingManager:
+    """记录执行的SQL，每次返回成功"""
+
+    def __init__(self):
+        self.queries = []
+
+    def execute_query(self, sql, params=None):
+        self.queries.append((sql, params))
+        return {'results': [], 'affected_rows': len(params) // len(ExceptionData._INSERT_COLUMNS),
+                'success': True}
+
+
+class InsertExceptionsBulkTest(unittest.TestCase):
+    """insert_exceptions_bulk 必填字段检查"""
+
+    def _row(self, **overrides):
+        row = {'stcd': 'S001', 'stnm': '测站', 'aid': '661101',
+               'tm': datetime(2025, 10, 10, 8, 0, 0), 'val': 1.5}
+        row.update(overrides)
+        return row
+
+    def test_optional_columns_default_to_null(self):
+        manager = _RecordingManager()
+        self.assertEqual(ExceptionData.insert_exceptions_bulk(manager, [self._row()]), 1)
+        _, params = manager.queries[0]
+        self.assertEqual(params[-3:], (None, None, None))
+
+    def test_missing_required_column_raises(self):
+        manager = _RecordingManager()
+        row = self._row()
+        del row['val']
+        with self.assertRaisesRegex(ValueError, 'val'):
+            ExceptionData.insert_exceptions_bulk(manager, [self._row(), row])
+        self.assertEqual(manager.queries, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
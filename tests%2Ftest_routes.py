@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+路由辅助函数测试
+"""
+
+import unittest
+
+from app.routes import convert_time_format
+
+
+class ConvertTimeFormatTest(unittest.TestCase):
+    """convert_time_format 与原嵌套函数的行为保持一致"""
+
+    def test_empty_values(self):
+        self.assertIsNone(convert_time_format(None))
+        self.assertEqual(convert_time_format(''), '')
+
+    def test_date_only(self):
+        self.assertEqual(convert_time_format('2025-10-10'), '2025-10-10 00:00:00')
+
+    def test_missing_seconds(self):
+        self.assertEqual(convert_time_format('2025-10-10 08:00'), '2025-10-10 08:00:00')
+
+    def test_plus_separator_keeps_plus(self):
+        # 16位且只有一个冒号，先命中补秒分支
+        self.assertEqual(convert_time_format('2025-10-10+08:00'), '2025-10-10+08:00:00')
+
+    def test_t_separator_is_not_rewritten(self):
+        self.assertEqual(convert_time_format('2025-10-10T08:00'), '2025-10-10T08:00:00')
+
+    def test_full_datetime_unchanged(self):
+        for value in ('2025-10-10 08:00:00', '2025-10-10T08:00:00', '2025-10-10+08:00:00'):
+            self.assertEqual(convert_time_format(value), value)
+
+    def test_unrecognized_unchanged(self):
+        for value in ('2025/10/10', '20251010', 'abc'):
+            self.assertEqual(convert_time_format(value), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原生验证器测试
+"""
+
+import unittest
+from datetime import datetime
+
+from app.schemas import PaginationSchema
+from app.validators import IntegerField, ListField, Schema, StringField, ValidationErrors
+
+
+class IntegerFieldTest(unittest.TestCase):
+    """IntegerField 整数转换"""
+
+    def setUp(self):
+        self.field = IntegerField(min_value=1, strict_str=True)
+        self.field.field_name = 'page'
+
+    def test_integer_string(self):
+        self.assertEqual(self.field.validate_or_error('3'), (3, None))
+
+    def test_non_integral_strings_rejected(self):
+        for value in ('1.5', '1e3', '1.0', 'abc', ''):
+            self.assertEqual(self.field.validate_or_error(value), (None, 'page必须是整数'), value)
+
+    def test_range_checked(self):
+        self.assertEqual(self.field.validate_or_error('0'), (None, 'page不能小于1'))
+
+    def test_float_strings_truncated_by_default(self):
+        field = IntegerField()
+        field.field_name = 'count'
+        self.assertEqual(field.validate_or_error('1.5'), (1, None))
+        self.assertEqual(field.validate_or_error('abc'), (None, 'count必须是整数'))
+
+
+class PaginationSchemaTest(unittest.TestCase):
+    """PaginationSchema 查询参数验证"""
+
+    def setUp(self):
+        self.schema = PaginationSchema()
+
+    def test_non_integral_page_rejected(self):
+        for value in ('1.5', '1e3'):
+            with self.assertRaises(ValidationErrors) as ctx:
+                self.schema.load({'page': value})
+            self.assertIn('page', ctx.exception.errors)
+
+    def test_unknown_param_rejected(self):
+        with self.assertRaises(ValidationErrors) as ctx:
+            self.schema.load({'page': '2', 'pagesize': '10'})
+        self.assertEqual(ctx.exception.errors, {'pagesize': ['未知字段']})
+
+
+class _SampleSchema(Schema):
+    def _setup_fields(self):
+        self.add_field('name', StringField(required=True, max_length=5))
+        self.add_field('count', IntegerField(default=1, min_value=0))
+
+
+class CompiledLoadTest(unittest.TestCase):
+    """Schema.load 生成的加载函数"""
+
+    def test_defaults_and_conversion(self):
+        self.assertEqual(_SampleSchema().load({'name': 'ab', 'count': '3'}), {'name': 'ab', 'count': 3})
+        self.assertEqual(_SampleSchema().load({'name': 'ab'}), {'name': 'ab', 'count': 1})
+
+    def test_errors_collected_per_field(self):
+        with self.assertRaises(ValidationErrors) as ctx:
+            _SampleSchema().load({'name': 'abcdef', 'count': '-1'})
+        self.assertEqual(set(ctx.exception.errors), {'name', 'count'})
+
+    def test_unknown_fields_ignored_by_default(self):
+        self.assertEqual(_SampleSchema().load({'name': 'ab', 'extra': 'x'}), {'name': 'ab', 'count': 1})
+
+    def test_add_field_recompiles(self):
+        schema = _SampleSchema()
+        schema.load({'name': 'ab'})
+        schema.add_field('tag', StringField(allow_none=True))
+        self.assertEqual(schema.load({'name': 'ab', 'tag': 't'}), {'name': 'ab', 'count': 1, 'tag': 't'})
+
+    def test_pagination_load_merges_aliases(self):
+        args = PaginationSchema().load({'aid': '661109', 'start_time': '2025-10-10 08:00:00', 'page': '2'})
+        self.assertEqual(args['page'], 2)
+        self.assertEqual(args['page_size'], 20)
+        self.assertEqual(args['status'], 0)
+        self.assertEqual(args['adcd'], '661109')
+        self.assertEqual(args['bt'], datetime(2025, 10, 10, 8, 0, 0))
+        self.assertNotIn('aid', args)
+
+
+class _UpperStringField(StringField):
+    __slots__ = ()
+
+    def _validate_value(self, value):
+        return super()._validate_value(value).upper()
+
+
+class _UpperSchema(Schema):
+    def _setup_fields(self):
+        self.add_field('code', _UpperStringField(max_length=3))
+        self.add_field('codes', ListField(_UpperStringField()))
+
+
+class OverriddenValidateValueTest(unittest.TestCase):
+    """覆盖_validate_value的字段子类在快速路径中同样生效"""
+
+    def test_field_validate(self):
+        field = _UpperStringField()
+        self.assertEqual(field.validate('abc'), 'ABC')
+        self.assertEqual(field.validate_or_error('abc'), ('ABC', None))
+
+    def test_schema_load(self):
+        self.assertEqual(_UpperSchema().load({'code': 'abc', 'codes': ['x', 'y']}),
+                         {'code': 'ABC', 'codes': ['X', 'Y']})
+
+    def test_parent_checks_still_apply(self):
+        with self.assertRaises(ValidationErrors) as ctx:
+            _UpperSchema().load({'code': 'abcd', 'codes': []})
+        self.assertEqual(list(ctx.exception.errors), ['code'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轻量xlsx写出测试
+"""
+
+import io
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from openpyxl import load_workbook
+
+from app.xlsx_fast import STYLE_BOLD, FastXlsxWorkbook
+
+
+class FastXlsxRoundTripTest(unittest.TestCase):
+    """FastXlsxWorkbook 写出后用openpyxl读回"""
+
+    def setUp(self):
+        self.buffer = io.BytesIO()
+
+    def _read_back(self):
+        self.buffer.seek(0)
+        return load_workbook(self.buffer)
+
+    def test_values_and_sheets(self):
+        with FastXlsxWorkbook(self.buffer) as workbook:
+            written = workbook.write_sheet(
+                '异常数据',
+                [['S001', 12, 3.5, Decimal('7.25')], ['S002', None, -1, Decimal('0')]],
+                header=['测站编码', '个数', '雨量', '累计'],
+                column_widths=[15, 10],
+                first_column_style=STYLE_BOLD,
+            )
+            workbook.write_sheet('汇总', [['合计', 2]])
+        self.assertEqual(written, 2)
+
+        wb = self._read_back()
+        self.assertEqual(wb.sheetnames, ['异常数据', '汇总'])
+        ws = wb['异常数据']
+        self.assertEqual([list(row) for row in ws.iter_rows(values_only=True)], [
+            ['测站编码', '个数', '雨量', '累计'],
+            ['S001', 12, 3.5, 7.25],
+            ['S002', None, -1, 0],
+        ])
+        self.assertTrue(ws['A1'].font.b)
+        self.assertTrue(ws['A2'].font.b)
+        self.assertFalse(ws['B2'].font.b)
+        self.assertEqual(ws.column_dimensions['A'].width, 15)
+        self.assertEqual([list(row) for row in wb['汇总'].iter_rows(values_only=True)], [['合计', 2]])
+
+    def test_non_numeric_values_written_as_text(self):
+        values = [True, float('nan'), float('inf'), Decimal('NaN'), Decimal('-Infinity'),
+                  datetime(2024, 1, 2, 3, 4, 5), 'a<b&c\x01']
+        with FastXlsxWorkbook(self.buffer) as workbook:
+            workbook.write_sheet('Sheet', [values])
+
+        row = next(self._read_back().active.iter_rows(values_only=True))
+        self.assertEqual(list(row), ['True', 'nan', 'inf', 'NaN', '-Infinity',
+                                     '2024-01-02 03:04:05', 'a<b&c'])
+
+
+if __name__ == '__main__':
+    unittest.main()